@@ -1,13 +1,118 @@
+import io
 import os
 import json
-from datetime import datetime
-from flask import Flask, render_template, jsonify, request
-from mlb_prediction_api import MLBPredictionAPI
-from mlb_stats_api import MLBStatsAPI
+import time
+import pstats
+from datetime import datetime, timezone
+from flask import Flask, Response, g, render_template, jsonify, request, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from prediction_engine import PREDICTION_TYPES
+from records import to_json
+import metrics
+import profiling
+import services
+
+class RecordJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes game and prediction records in their API shape"""
+    
+    @staticmethod
+    def default(o):
+        try:
+            return to_json(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
 
 app = Flask(__name__)
-prediction_api = MLBPredictionAPI()
-stats_api = MLBStatsAPI()
+app.json = RecordJSONProvider(app)
+
+def cache_stats():
+    """Hit/miss counters of the in-memory caches, keyed by cache name"""
+    prediction_api = services.get_prediction_api()
+    return {
+        "predictions": prediction_api.memory_cache.stats(),
+        "payloads": prediction_api.payload_cache.stats(),
+        "games": prediction_api.stats_api.games_cache.stats(),
+        "game_predictions": dict(prediction_api.game_prediction_counts),
+        "pitcher_eras": prediction_api.stats_api.pitcher_store.stats()
+    }
+
+if metrics.ENABLED:
+    request_latency = metrics.REGISTRY.histogram(
+        'mlb_http_request_duration_seconds', "HTTP request latency by route", ('route', 'method', 'status')
+    )
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+    
+    @app.after_request
+    def record_request_latency(response):
+        start = g.pop('request_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            request_latency.observe(time.perf_counter() - start, route, request.method, str(response.status_code))
+        return response
+    
+    for counter in ('hits', 'misses', 'evictions'):
+        metrics.REGISTRY.register_callback(
+            f'mlb_cache_{counter}_total', 'counter', f"In-memory cache {counter} by cache",
+            lambda counter=counter: [({'cache': name}, stats.get(counter, 0)) for name, stats in cache_stats().items()]
+        )
+    metrics.REGISTRY.register_callback(
+        'mlb_rebuilds_in_flight', 'gauge', "Cache rebuilds currently running in this worker",
+        lambda: [
+            ({'stage': 'predictions'}, services.get_prediction_api().single_flight.in_flight()),
+            ({'stage': 'games'}, services.get_stats_api().single_flight.in_flight())
+        ]
+    )
+
+# Opt-in request profiling (PROFILING_ENABLED=1); captures are listed at /api/admin/profiles
+profiler = profiling.RequestProfiler.from_env() if profiling.ENABLED else None
+
+if profiler is not None:
+    @app.before_request
+    def start_request_profile():
+        requested = profiler.has_token(request.headers.get('X-Profile', request.args.get('profile')))
+        g.profile_state = profiler.start(requested)
+    
+    @app.after_request
+    def finish_request_profile(response):
+        state = g.pop('profile_state', None)
+        if state is None:
+            return response
+        details = (request.method, request.path, request.query_string.decode('latin-1'), response.status_code)
+        if response.is_streamed:
+            # A streamed body (NDJSON) is generated after this hook, so finish once it has been sent
+            if state['profile'] is not None:
+                response.headers['X-Profile-Id'] = state['id']
+            response.call_on_close(lambda: profiler.finish(state, *details))
+        else:
+            capture_id = profiler.finish(state, *details)
+            if capture_id is not None:
+                response.headers['X-Profile-Id'] = capture_id
+        return response
+
+def ndjson_response(items):
+    """Stream an iterable of dicts as newline-delimited JSON, one line per item"""
+    def generate():
+        for item in items:
+            yield json.dumps(item) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def payload_response(payload):
+    """Serve a pre-serialized payload with ETag/Last-Modified, gzip and 304 support"""
+    use_gzip = request.accept_encodings['gzip'] > 0
+    response = Response(payload.gzip_body if use_gzip else payload.body, mimetype='application/json')
+    if use_gzip:
+        response.content_encoding = 'gzip'
+    
+    # Each encoding is a distinct representation, so it gets its own ETag
+    response.set_etag(payload.etag + ('-gzip' if use_gzip else ''))
+    response.last_modified = datetime.fromtimestamp(payload.timestamp, timezone.utc)
+    response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+    return response.make_conditional(request)
 
 @app.route('/')
 def index():
@@ -15,11 +120,12 @@ def index():
     # Get current date in YYYY-MM-DD format
     today = datetime.now().strftime('%Y-%m-%d')
     now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    return render_template('index.html', date=today, now=now)
+    return render_template('index.html', date=today, now=now, push_url=os.environ.get('PUSH_URL', ''))
 
 @app.route('/api/predictions')
 def get_predictions():
     """API endpoint to get predictions"""
+    prediction_api = services.get_prediction_api()
     prediction_type = request.args.get('type', 'under_1_run_1st')
     date_str = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
     
@@ -33,24 +139,174 @@ def get_predictions():
     internal_type = type_mapping.get(prediction_type, 'under_1_run_1st')
     
     try:
-        predictions = prediction_api.get_predictions(internal_type, date_str)
-        return jsonify(predictions)
+        if request.args.get('format') == 'ndjson':
+            return ndjson_response(prediction_api.iter_predictions(date_str, date_str, (internal_type,)))
+        payload = prediction_api.get_predictions_payload(internal_type, date_str)
+        return payload_response(payload)
     except Exception as e:
         app.logger.error(f"Error getting predictions: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/predictions/range')
+def get_predictions_range():
+    """API endpoint to get predictions for a range of dates in one response"""
+    prediction_api = services.get_prediction_api()
+    start_str = request.args.get('start')
+    end_str = request.args.get('end', start_str)
+    types = request.args.get('types')
+    prediction_types = types.split(',') if types else list(PREDICTION_TYPES)
+    
+    if not start_str:
+        return jsonify({"error": "start date is required"}), 400
+    unknown = [t for t in prediction_types if t not in PREDICTION_TYPES]
+    if unknown:
+        return jsonify({"error": f"Unknown prediction types: {', '.join(unknown)}"}), 400
+    
+    try:
+        if request.args.get('format') == 'ndjson':
+            return ndjson_response(prediction_api.iter_predictions(start_str, end_str, prediction_types))
+        predictions = prediction_api.get_predictions_range(start_str, end_str, prediction_types)
+        return jsonify({"start": start_str, "end": end_str, "predictions": predictions})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error getting predictions range: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/archive')
+def query_archive():
+    """API endpoint to query archived predictions by date range, type, team, stadium and pitcher"""
+    prediction_api = services.get_prediction_api()
+    if prediction_api.archive is None:
+        return jsonify({"error": "The prediction archive is disabled"}), 404
+    
+    prediction_type = request.args.get('type')
+    if prediction_type is not None and prediction_type not in PREDICTION_TYPES:
+        return jsonify({"error": f"Unknown prediction type: {prediction_type}"}), 400
+    
+    try:
+        start_str = request.args.get('start')
+        end_str = request.args.get('end')
+        for date_str in (start_str, end_str):
+            if date_str:
+                datetime.strptime(date_str, '%Y-%m-%d')
+        limit = min(int(request.args.get('limit', 1000)), 10000)
+        if limit <= 0:
+            raise ValueError("limit must be a positive integer")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    predictions = prediction_api.archive.query(
+        start_str, end_str, prediction_type,
+        team=request.args.get('team'),
+        stadium=request.args.get('stadium'),
+        pitcher=request.args.get('pitcher'),
+        latest=request.args.get('all', '').lower() not in ('1', 'true', 'yes'),
+        limit=limit
+    )
+    if request.args.get('format') == 'ndjson':
+        return ndjson_response(predictions)
+    return jsonify({"count": len(predictions), "predictions": predictions})
+
 @app.route('/api/refresh')
 def refresh_data():
-    """API endpoint to refresh data"""
+    """API endpoint to refresh data, optionally scoped by date, type or pitcher"""
+    prediction_api = services.get_prediction_api()
+    date_str = request.args.get('date')
+    prediction_type = request.args.get('type')
+    pitcher = request.args.get('pitcher')
+    team = request.args.get('team')
+    rebuild = request.args.get('rebuild', '').lower() in ('1', 'true', 'yes')
+    
+    if prediction_type is not None and prediction_type not in PREDICTION_TYPES:
+        return jsonify({"status": "error", "message": f"Unknown prediction type: {prediction_type}"}), 400
+    
     try:
+        if date_str or prediction_type or pitcher:
+            # Targeted invalidation of just the affected entries
+            dates = prediction_api.invalidate(date_str, prediction_type, pitcher, team, rebuild=rebuild)
+            return jsonify({
+                "status": "success",
+                "message": f"Invalidated cached data for {len(dates)} date(s)",
+                "dates": dates,
+                "rebuilding": rebuild and bool(dates)
+            })
+        
         # Clear caches
-        stats_api.clear_cache()
+        prediction_api.stats_api.clear_cache()
         prediction_api.clear_cache()
         return jsonify({"status": "success", "message": "Data refreshed successfully"})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         app.logger.error(f"Error refreshing data: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/cache')
+def cache_status():
+    """API endpoint to report cache disk usage and in-memory hit rates"""
+    prediction_api = services.get_prediction_api()
+    return jsonify({
+        "disk": services.get_cache_manager().usage(),
+        "memory": cache_stats(),
+        "archive": prediction_api.archive.stats() if prediction_api.archive is not None else None
+    })
+
+def profile_admin_error():
+    """Error response if profile captures cannot be served to this request, else None"""
+    if profiler is None:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    if profiler.token is None:
+        return jsonify({"error": "Set PROFILE_TOKEN to use the profile admin endpoints"}), 403
+    if not profiler.has_token(request.headers.get('X-Profile-Token', request.args.get('token'))):
+        return jsonify({"error": "A valid profile token is required"}), 403
+    return None
+
+@app.route('/api/admin/profiles')
+def list_profiles():
+    """Admin endpoint listing stored profile and slow-request captures, newest first"""
+    error = profile_admin_error()
+    if error is not None:
+        return error
+    
+    return jsonify({
+        "sample_rate": profiler.sample_rate,
+        "slow_ms": profiler.slow_ms,
+        "max_captures": profiler.max_captures,
+        "captures": profiler.captures()
+    })
+
+@app.route('/api/admin/profiles/<capture_id>')
+def get_profile(capture_id):
+    """Admin endpoint to download one capture; format=text renders a cProfile capture as a report"""
+    error = profile_admin_error()
+    if error is not None:
+        return error
+    
+    capture = profiler.capture_file(capture_id)
+    if capture is None:
+        return jsonify({"error": f"No such capture: {capture_id}"}), 404
+    path, kind = capture
+    
+    if kind == 'cprofile' and request.args.get('format') == 'text':
+        report = io.StringIO()
+        pstats.Stats(path, stream=report).sort_stats('cumulative').print_stats(request.args.get('limit', 50, type=int))
+        return Response(report.getvalue(), mimetype='text/plain')
+    mimetype = 'application/octet-stream' if kind == 'cprofile' else 'text/plain'
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=os.path.basename(path))
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint.
+    
+    Metrics live in process memory, so under gunicorn each scrape returns the
+    counters and histograms of whichever worker answered it. Scrape every
+    worker (or run a single worker) to see the whole instance.
+    """
+    if not metrics.ENABLED:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(metrics.REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.errorhandler(404)
 def page_not_found(e):
     """Handle 404 errors"""
@@ -61,9 +317,12 @@ def server_error(e):
     """Handle 500 errors"""
     return render_template('index.html', error="Server error occurred"), 500
 
-# Create cache directories
-os.makedirs(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'mlb_stats'), exist_ok=True)
-os.makedirs(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'predictions'), exist_ok=True)
+# Sweeper and prewarm threads; under gunicorn (gunicorn.conf.py sets
+# MLB_DEFER_SERVICES) they are started in each worker after the fork instead.
+# Build pool processes (and their forkserver) re-import this module as __mp_main__
+# and must not start them.
+if os.environ.get('MLB_DEFER_SERVICES') != '1' and __name__ != '__mp_main__':
+    services.start_background_services()
 
 if __name__ == '__main__':
     # Get port from environment variable or use default
@@ -0,0 +1,256 @@
+"""ASGI entry point serving /api/predictions and /api/refresh without blocking.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8080 --workers 2
+
+Takes the same parameters and gives the same responses as those routes of
+the Flask app (app.py), for deployments that hold many concurrent
+connections per instance. The event loop never touches the disk or runs the
+model itself:
+
+- cache reads and invalidations run on the loop's thread pool;
+- a date that is not cached is built on the process pool of
+  mlb_prediction_api, once for every request waiting on it, and then read
+  from the cache file the pool worker wrote.
+
+Both apps use the same cache directory, so they can run side by side.
+"""
+import json
+import asyncio
+import logging
+from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+from urllib.parse import parse_qs
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.http import http_date, is_resource_modified, parse_accept_header, quote_etag
+
+import services
+from mlb_prediction_api import build_executor, reset_build_executor, warm_date
+from prediction_engine import PREDICTION_TYPES
+
+logger = logging.getLogger(__name__)
+
+# NDJSON lines produced per trip to the thread pool
+STREAM_BATCH = 500
+
+
+class Request:
+    """Method, query arguments and headers of an HTTP scope"""
+
+    def __init__(self, scope):
+        self.method = scope['method']
+        query = parse_qs(scope['query_string'].decode('latin-1'), keep_blank_values=True)
+        self.args = {name: values[0] for name, values in query.items()}
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+
+
+class PredictionASGI:
+    """ASGI application for the prediction endpoints"""
+
+    def __init__(self):
+        self.routes = {
+            '/api/predictions': self.get_predictions,
+            '/api/refresh': self.refresh_data
+        }
+        self._builds = {}  # date -> Future of the pool build in progress
+        self._tasks = set()  # Background rebuilds, referenced until they finish
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        handler = self.routes.get(scope['path'])
+        if handler is None:
+            await send_json(send, 404, {"error": "Not found"})
+        elif scope['method'] not in ('GET', 'HEAD'):
+            await send_json(send, 405, {"error": "Method not allowed"}, [(b'allow', b'GET, HEAD')])
+        else:
+            await handler(Request(scope), send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Builds the shared API and starts the sweeper and prewarm threads
+                await asyncio.get_running_loop().run_in_executor(None, services.start_background_services)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def get_predictions(self, request, send):
+        """Predictions for a type and date, as JSON (or NDJSON with format=ndjson)"""
+        prediction_type = request.args.get('type', 'under_1_run_1st')
+        if prediction_type not in PREDICTION_TYPES:
+            prediction_type = 'under_1_run_1st'
+        date_str = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
+        ndjson = request.args.get('format') == 'ndjson'
+
+        api = services.get_prediction_api()
+        loop = asyncio.get_running_loop()
+        try:
+            if ndjson:
+                if not await loop.run_in_executor(None, api.has_predictions, date_str):
+                    await self._build(date_str)
+                items = api.iter_predictions(date_str, date_str, (prediction_type,))
+            else:
+                payload = await loop.run_in_executor(None, _cached_payload, api, prediction_type, date_str)
+                if payload is None:
+                    await self._build(date_str)
+                    payload = await loop.run_in_executor(None, api.get_predictions_payload, prediction_type, date_str)
+        except Exception as e:
+            logger.error(f"Error getting predictions: {str(e)}")
+            await send_json(send, 500, {"error": str(e)})
+            return
+
+        if ndjson:
+            await send_ndjson(send, items)
+        else:
+            await send_payload(request, send, payload)
+
+    async def refresh_data(self, request, send):
+        """Invalidate cached data, optionally scoped by date, type or pitcher"""
+        date_str = request.args.get('date')
+        prediction_type = request.args.get('type')
+        pitcher = request.args.get('pitcher')
+        team = request.args.get('team')
+        rebuild = request.args.get('rebuild', '').lower() in ('1', 'true', 'yes')
+
+        if prediction_type is not None and prediction_type not in PREDICTION_TYPES:
+            await send_json(send, 400, {"status": "error", "message": f"Unknown prediction type: {prediction_type}"})
+            return
+
+        api = services.get_prediction_api()
+        loop = asyncio.get_running_loop()
+        try:
+            if date_str or prediction_type or pitcher:
+                # Targeted invalidation of just the affected entries
+                dates = await loop.run_in_executor(
+                    None, partial(api.invalidate, date_str, prediction_type, pitcher, team)
+                )
+                if rebuild and dates:
+                    self._rebuild(dates)
+                body = {
+                    "status": "success",
+                    "message": f"Invalidated cached data for {len(dates)} date(s)",
+                    "dates": dates,
+                    "rebuilding": rebuild and bool(dates)
+                }
+            else:
+                await loop.run_in_executor(None, _clear_caches, api)
+                body = {"status": "success", "message": "Data refreshed successfully"}
+        except ValueError as e:
+            await send_json(send, 400, {"status": "error", "message": str(e)})
+            return
+        except Exception as e:
+            logger.error(f"Error refreshing data: {str(e)}")
+            await send_json(send, 500, {"status": "error", "message": str(e)})
+            return
+
+        await send_json(send, 200, body)
+
+    async def _build(self, date_str):
+        """Build a date's predictions on the process pool, once for all concurrent requests"""
+        build = self._builds.get(date_str)
+        if build is None:
+            build = asyncio.ensure_future(self._run_build(date_str))
+            self._builds[date_str] = build
+            build.add_done_callback(lambda _: self._builds.pop(date_str, None))
+
+        # A client that disconnects must not cancel the build others are waiting for
+        await asyncio.shield(build)
+
+    async def _run_build(self, date_str):
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(build_executor(), warm_date, date_str)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool next time and build on a thread now
+            reset_build_executor()
+            await loop.run_in_executor(None, services.get_prediction_api().get_all_predictions, date_str)
+
+    def _rebuild(self, dates):
+        """Rebuild invalidated dates in the background so the next request finds them warm"""
+        async def rebuild():
+            for date_str in dates:
+                try:
+                    await self._build(date_str)
+                except Exception:
+                    logger.exception(f"Error rebuilding predictions for {date_str}")
+
+        task = asyncio.ensure_future(rebuild())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+def _cached_payload(api, prediction_type, date_str):
+    """Payload of a cached date, or None if serving it would mean building it"""
+    if not api.has_predictions(date_str):
+        return None
+    return api.get_predictions_payload(prediction_type, date_str)
+
+
+def _clear_caches(api):
+    api.stats_api.clear_cache()
+    api.clear_cache()
+
+
+async def send_response(send, status, headers, body=b''):
+    headers = headers + [(b'content-length', str(len(body)).encode('latin-1'))]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, status, data, headers=()):
+    """Send data as a JSON response, serialized as Flask's jsonify does"""
+    body = (json.dumps(data, separators=(',', ':'), sort_keys=True) + '\n').encode('utf-8')
+    await send_response(send, status, [(b'content-type', b'application/json')] + list(headers), body)
+
+
+async def send_payload(request, send, payload):
+    """Send a pre-serialized payload with ETag/Last-Modified, gzip and 304 support"""
+    use_gzip = parse_accept_header(request.headers.get('accept-encoding'))['gzip'] > 0
+    etag = payload.etag + ('-gzip' if use_gzip else '')
+    last_modified = datetime.fromtimestamp(payload.timestamp, timezone.utc)
+    headers = [
+        (b'etag', quote_etag(etag).encode('latin-1')),
+        (b'cache-control', b'no-cache'),
+        (b'vary', b'Accept-Encoding')
+    ]
+
+    conditions = {
+        'HTTP_IF_NONE_MATCH': request.headers.get('if-none-match'),
+        'HTTP_IF_MODIFIED_SINCE': request.headers.get('if-modified-since')
+    }
+    environ = {name: value for name, value in conditions.items() if value is not None}
+    if not is_resource_modified(environ, etag, last_modified=last_modified):
+        await send_response(send, 304, headers)
+        return
+
+    headers += [
+        (b'content-type', b'application/json'),
+        (b'last-modified', http_date(last_modified).encode('latin-1'))
+    ]
+    if use_gzip:
+        headers.append((b'content-encoding', b'gzip'))
+    await send_response(send, 200, headers, payload.gzip_body if use_gzip else payload.body)
+
+
+async def send_ndjson(send, items):
+    """Stream an iterable of dicts as newline-delimited JSON, pulled from it on the thread pool"""
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'application/x-ndjson')]})
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await loop.run_in_executor(None, lambda: list(islice(items, STREAM_BATCH)))
+        if not batch:
+            break
+        body = ''.join(json.dumps(item) + '\n' for item in batch).encode('utf-8')
+        await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+app = PredictionASGI()
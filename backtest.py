@@ -0,0 +1,277 @@
+"""Replay the prediction model over historical slates and score the results.
+
+History is read from a directory of local files, one per date:
+
+    <history>/YYYY-MM-DD.json
+    {"date": "2024-04-01", "games": [{...game fields..., "innings": [[away, home], ...]}]}
+
+Each game carries the same fields get_games_for_date returns plus the runs
+scored per inning (at least the first three). Dates are sharded across a
+process pool; every worker folds its shard into a BacktestAccumulator, so
+memory stays bounded by one slate per worker however long the range is.
+
+    python backtest.py run HISTORY_DIR [--start 2024-04-01 --end 2024-09-29]
+    python backtest.py synthesize HISTORY_DIR --start 2024-03-28 --end 2024-09-29
+"""
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from cache_io import read_json, write_json_atomic
+from prediction_engine import PREDICTION_TYPES, MARKETS, build_engine, era_or_default, rate
+from records import Game
+from reference_data import BALLPARK_FACTORS
+
+RATINGS = ('Bet', 'Lean', 'Pass')
+
+# Calibration bins over predicted probability, in percent
+CALIBRATION_EDGES = np.arange(0, 105, 5)
+
+# Standard -110 line, as decimal odds
+DEFAULT_ODDS = 1 + 100 / 110
+
+# Per-process prediction engine used by pool workers
+_worker_engine = None
+
+
+class BacktestAccumulator:
+    """Streaming reducer for backtest results.
+
+    Holds fixed-size counters per prediction type (by rating and by
+    calibration bin), so accumulators can be filled slate by slate and merged
+    across workers without keeping any individual prediction.
+    """
+
+    def __init__(self, prediction_types=PREDICTION_TYPES, odds=DEFAULT_ODDS):
+        self.prediction_types = tuple(prediction_types)
+        self.odds = odds
+        self.dates = 0
+        self.games = 0
+        self.skipped = 0
+        bins = len(CALIBRATION_EDGES) - 1
+        self.markets = {
+            prediction_type: {
+                'brier': 0.0,
+                'log_loss': 0.0,
+                'ratings': {rating: [0, 0] for rating in RATINGS},  # [predictions, wins]
+                'bin_count': np.zeros(bins, dtype=np.int64),
+                'bin_probability': np.zeros(bins, dtype=np.float64),
+                'bin_wins': np.zeros(bins, dtype=np.int64)
+            }
+            for prediction_type in self.prediction_types
+        }
+
+    def add(self, prediction_type, probabilities, outcomes):
+        """Fold in one batch: probabilities in percent and boolean outcomes"""
+        market = self.markets[prediction_type]
+        p = np.clip(probabilities / 100, 1e-6, 1 - 1e-6)
+        won = outcomes.astype(np.float64)
+
+        market['brier'] += float(np.sum((p - won) ** 2))
+        market['log_loss'] -= float(np.sum(won * np.log(p) + (1 - won) * np.log(1 - p)))
+
+        ratings = rate(probabilities)
+        for rating in RATINGS:
+            mask = ratings == rating
+            market['ratings'][rating][0] += int(mask.sum())
+            market['ratings'][rating][1] += int(outcomes[mask].sum())
+
+        bins = np.clip(np.digitize(probabilities, CALIBRATION_EDGES) - 1, 0, len(CALIBRATION_EDGES) - 2)
+        size = len(CALIBRATION_EDGES) - 1
+        market['bin_count'] += np.bincount(bins, minlength=size)
+        market['bin_probability'] += np.bincount(bins, weights=probabilities, minlength=size)
+        market['bin_wins'] += np.bincount(bins, weights=won, minlength=size).astype(np.int64)
+
+    def merge(self, other):
+        """Add another accumulator's counts into this one"""
+        self.dates += other.dates
+        self.games += other.games
+        self.skipped += other.skipped
+        for prediction_type, market in self.markets.items():
+            theirs = other.markets[prediction_type]
+            market['brier'] += theirs['brier']
+            market['log_loss'] += theirs['log_loss']
+            for rating in RATINGS:
+                market['ratings'][rating][0] += theirs['ratings'][rating][0]
+                market['ratings'][rating][1] += theirs['ratings'][rating][1]
+            for key in ('bin_count', 'bin_probability', 'bin_wins'):
+                market[key] += theirs[key]
+        return self
+
+    def report(self):
+        """Summarize calibration and flat-stake ROI as a JSON-ready dict.
+
+        ROI assumes one unit staked on every prediction at the accumulator's
+        decimal odds; Pass is scored the same way to show what skipping saves.
+        """
+        markets = {}
+        for prediction_type, market in self.markets.items():
+            total = sum(count for count, _ in market['ratings'].values())
+            wins = sum(won for _, won in market['ratings'].values())
+            ratings = {}
+            for rating, (count, won) in market['ratings'].items():
+                profit = won * (self.odds - 1) - (count - won)
+                ratings[rating] = {
+                    'predictions': count,
+                    'wins': won,
+                    'hit_rate': round(won / count, 4) if count else None,
+                    'profit_units': round(profit, 2),
+                    'roi': round(profit / count, 4) if count else None
+                }
+
+            calibration = [
+                {
+                    'bin': f"{CALIBRATION_EDGES[i]}-{CALIBRATION_EDGES[i + 1]}",
+                    'predictions': int(count),
+                    'mean_probability': round(float(market['bin_probability'][i]) / count, 2),
+                    'hit_rate': round(100 * int(market['bin_wins'][i]) / count, 2)
+                }
+                for i, count in enumerate(market['bin_count'])
+                if count
+            ]
+
+            markets[prediction_type] = {
+                'predictions': total,
+                'hit_rate': round(wins / total, 4) if total else None,
+                'brier': round(market['brier'] / total, 4) if total else None,
+                'log_loss': round(market['log_loss'] / total, 4) if total else None,
+                'ratings': ratings,
+                'calibration': calibration
+            }
+
+        return {'dates': self.dates, 'games': self.games, 'skipped_files': self.skipped, 'markets': markets}
+
+
+def outcomes(games, prediction_type):
+    """Whether each game's result landed on the predicted side of the market"""
+    innings, line, side = MARKETS[prediction_type]
+    runs = np.array([sum(sum(inning) for inning in game['innings'][:innings]) for game in games], dtype=np.float64)
+    return runs < line if side == 'under' else runs > line
+
+
+def history_files(history_dir, start_str=None, end_str=None):
+    """Sorted paths of the history files in a directory, optionally within a date range"""
+    paths = []
+    for entry in os.scandir(history_dir):
+        date_str, ext = os.path.splitext(entry.name)
+        if ext != '.json' or not entry.is_file():
+            continue
+        try:
+            datetime.strptime(date_str, '%Y-%m-%d')
+        except ValueError:
+            continue
+        if (start_str and date_str < start_str) or (end_str and date_str > end_str):
+            continue
+        paths.append(entry.path)
+    return sorted(paths)
+
+
+def run_shard(paths, prediction_types=PREDICTION_TYPES, odds=DEFAULT_ODDS):
+    """Score a list of history files in this process; returns an accumulator"""
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = build_engine(BALLPARK_FACTORS)
+
+    accumulator = BacktestAccumulator(prediction_types, odds)
+    for path in paths:
+        slate = read_json(path, required=('games',))
+        if slate is None:
+            accumulator.skipped += 1
+            continue
+
+        # Postponed or otherwise incomplete games have nothing to score against
+        games = [game for game in slate['games'] if len(game.get('innings', ())) >= 3]
+        accumulator.dates += 1
+        accumulator.games += len(games)
+        if not games:
+            continue
+
+        probabilities = _worker_engine.probabilities([Game.from_dict(game) for game in games], prediction_types)
+        for t, prediction_type in enumerate(prediction_types):
+            accumulator.add(prediction_type, probabilities[t], outcomes(games, prediction_type))
+    return accumulator
+
+
+def run_backtest(history_dir, start_str=None, end_str=None, prediction_types=PREDICTION_TYPES,
+                 odds=DEFAULT_ODDS, workers=None):
+    """Backtest every history file in range across a process pool; returns the report dict"""
+    paths = history_files(history_dir, start_str, end_str)
+    workers = workers or os.cpu_count() or 1
+    total = BacktestAccumulator(prediction_types, odds)
+    if not paths:
+        return total.report()
+
+    if workers == 1:
+        return total.merge(run_shard(paths, prediction_types, odds)).report()
+
+    # A few shards per worker keeps the pool balanced when slates differ in size
+    shard_size = max(1, len(paths) // (workers * 4))
+    shards = [paths[i:i + shard_size] for i in range(0, len(paths), shard_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_shard, shard, prediction_types, odds) for shard in shards]
+        for future in as_completed(futures):
+            total.merge(future.result())
+    return total.report()
+
+
+def synthesize_history(history_dir, start_str, end_str):
+    """Write synthetic history files for a date range, for trying the backtest offline.
+
+    Slates come from the local game generator; runs per half inning are
+    Poisson draws whose mean follows the opposing starter's ERA and the
+    ballpark factor, seeded per date so the output is reproducible.
+    """
+    from mlb_prediction_api import date_range
+    from mlb_stats_api import MLBStatsAPI, stable_seed
+
+    stats_api = MLBStatsAPI()
+    dates = date_range(start_str, end_str, max_days=366)
+    for date_str in dates:
+        rng = np.random.default_rng(stable_seed(date_str, 'innings'))
+        games = []
+        for game in stats_api.generate_games_for_date(date_str):
+            park = BALLPARK_FACTORS.get(game.stadium, 1.0)
+            # The away side bats against the home starter and vice versa
+            means = np.array([era_or_default(game.home_era), era_or_default(game.away_era)]) / 9 * park
+            games.append(dict(game.to_dict(), innings=rng.poisson(means, size=(9, 2)).tolist()))
+        write_json_atomic(os.path.join(history_dir, f"{date_str}.json"), {'date': date_str, 'games': games})
+    return len(dates)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="backtest the model over a history directory")
+    run.add_argument('history_dir')
+    run.add_argument('--start', help="first date (YYYY-MM-DD) to include")
+    run.add_argument('--end', help="last date (YYYY-MM-DD) to include")
+    run.add_argument('--types', default=','.join(PREDICTION_TYPES), help="comma-separated prediction types")
+    run.add_argument('--odds', type=int, default=-110, help="American odds for the ROI calculation")
+    run.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    run.add_argument('--output', help="write the report here instead of printing it")
+
+    synthesize = commands.add_parser('synthesize', help="write synthetic history files")
+    synthesize.add_argument('history_dir')
+    synthesize.add_argument('--start', required=True)
+    synthesize.add_argument('--end', required=True)
+
+    args = parser.parse_args()
+    if args.command == 'synthesize':
+        count = synthesize_history(args.history_dir, args.start, args.end)
+        print(f"Wrote {count} slates to {args.history_dir}")
+    else:
+        prediction_types = args.types.split(',')
+        unknown = [t for t in prediction_types if t not in MARKETS]
+        if unknown:
+            parser.error(f"unknown prediction types: {', '.join(unknown)}")
+        odds = 1 + (100 / -args.odds if args.odds < 0 else args.odds / 100)
+        report = run_backtest(args.history_dir, args.start, args.end, prediction_types, odds, args.workers)
+        if args.output:
+            write_json_atomic(args.output, report)
+        else:
+            print(json.dumps(report, indent=2))
@@ -0,0 +1,95 @@
+"""Benchmarks for the prediction service.
+
+    python -m benchmarks.micro                 # cold/warm micro benchmarks
+    python -m benchmarks.load --target flask   # end-to-end load test
+    python -m benchmarks.load --target gunicorn --workers 4
+    python -m benchmarks.startup               # import, first response, boot
+    python -m benchmarks.compare OLD.json NEW.json
+
+Every run writes its results as JSON (by default to
+benchmarks/results/<suite>_<commit>.json) so runs can be compared across
+commits. Benchmarks use a throwaway cache and archive directory, never
+./cache or ./archive.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+
+# Must happen before the app modules are imported: they read these at import time
+os.environ.setdefault('MLB_CACHE_DIR', tempfile.mkdtemp(prefix='mlb-bench-'))
+os.environ.setdefault('MLB_ARCHIVE_DIR', os.path.join(os.environ['MLB_CACHE_DIR'], 'archive'))
+os.environ.setdefault('PREWARM_ENABLED', '0')
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, 'benchmarks', 'results')
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+def summarize(samples):
+    """Summary statistics (in milliseconds) for a list of durations in seconds"""
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'mean_ms': statistics.mean(ordered) * 1000,
+        'min_ms': ordered[0] * 1000,
+        'p50_ms': _percentile(ordered, 50) * 1000,
+        'p90_ms': _percentile(ordered, 90) * 1000,
+        'p99_ms': _percentile(ordered, 99) * 1000,
+        'max_ms': ordered[-1] * 1000
+    }
+
+
+def measure(fn, repeat, setup=None):
+    """Time fn() repeat times, calling setup() untimed before each run"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def git_commit():
+    """Short hash of the checked-out commit, or 'unknown'"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def write_results(suite, results, output=None):
+    """Write results with run metadata as JSON; returns the path written"""
+    commit = git_commit()
+    if output is None:
+        output = os.path.join(RESULTS_DIR, f"{suite}_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    with open(output, 'w') as f:
+        json.dump({
+            'suite': suite,
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'results': results
+        }, f, indent=2)
+    return output
+
+
+def _percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,50 @@
+"""Compare two benchmark result files metric by metric.
+
+    python -m benchmarks.compare benchmarks/results/micro_abc123.json benchmarks/results/micro_def456.json
+
+Prints every numeric metric found in both files with the new/old ratio.
+For latencies a ratio below 1.0 is an improvement; for throughput_rps it
+is a regression.
+"""
+import sys
+import json
+import argparse
+
+
+def flatten(value, prefix=''):
+    """Yield (dotted.path, number) for every numeric leaf in nested results"""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from flatten(child, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, list):
+        for i, child in enumerate(value):
+            yield from flatten(child, f"{prefix}[{i}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('old')
+    parser.add_argument('new')
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    if old.get('suite') != new.get('suite'):
+        sys.exit(f"Cannot compare suite {old.get('suite')!r} with {new.get('suite')!r}")
+
+    old_metrics = dict(flatten(old['results']))
+    print(f"{'metric':60} {old.get('commit', '?'):>12} {new.get('commit', '?'):>12}   ratio")
+    for name, new_value in flatten(new['results']):
+        if name not in old_metrics:
+            continue
+        old_value = old_metrics[name]
+        ratio = f"{new_value / old_value:7.2f}x" if old_value else '      -'
+        print(f"{name:60} {old_value:12.3f} {new_value:12.3f} {ratio}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""End-to-end load test of /api/predictions under concurrent clients.
+
+Runs entirely on localhost: either the Flask app in-process (threaded
+werkzeug server) or gunicorn in a subprocess. Games are generated locally,
+so no network access is needed.
+"""
+import os
+import sys
+import time
+import socket
+import logging
+import argparse
+import threading
+import subprocess
+from datetime import date, timedelta
+
+import requests
+
+from benchmarks import REPO_DIR, summarize, write_results
+from prediction_engine import PREDICTION_TYPES
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_flask(port):
+    """Serve the app from a thread in this process; returns a stop function"""
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server.shutdown
+
+
+def start_gunicorn(port, workers):
+    """Run gunicorn in a subprocess; returns a stop function"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '-w', str(workers), '-b', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        cwd=REPO_DIR, env=dict(os.environ)
+    )
+
+    def stop():
+        process.terminate()
+        process.wait(timeout=30)
+    return stop
+
+
+def wait_until_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{base_url}/api/cache", timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+def request_mix(days):
+    """(type, date) pairs cycled through by the clients"""
+    start = date.today()
+    return [
+        (prediction_type, (start + timedelta(days=offset)).strftime('%Y-%m-%d'))
+        for offset in range(days)
+        for prediction_type in PREDICTION_TYPES
+    ]
+
+
+def run_clients(base_url, clients, duration, mix):
+    """Hammer the endpoint from `clients` threads for `duration` seconds"""
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        session = requests.Session()
+        i = index
+        while time.perf_counter() < deadline:
+            prediction_type, date_str = mix[i % len(mix)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                response = session.get(
+                    f"{base_url}/api/predictions", params={'type': prediction_type, 'date': date_str}, timeout=30
+                )
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            if ok:
+                latencies[index].append(time.perf_counter() - start)
+            else:
+                errors[index] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = [latency for per_client in latencies for latency in per_client]
+    return {
+        'clients': clients,
+        'duration_s': elapsed,
+        'requests': len(samples),
+        'errors': sum(errors),
+        'throughput_rps': len(samples) / elapsed,
+        'latency': summarize(samples) if samples else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--target', choices=('flask', 'gunicorn'), default='flask')
+    parser.add_argument('--workers', type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32], help="concurrency levels to run")
+    parser.add_argument('--duration', type=float, default=10, help="seconds per concurrency level")
+    parser.add_argument('--days', type=int, default=3, help="distinct dates in the request mix")
+    parser.add_argument('--output', help="results file (default benchmarks/results/load_<target>_<commit>.json)")
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    stop = start_gunicorn(port, args.workers) if args.target == 'gunicorn' else start_flask(port)
+    try:
+        wait_until_ready(base_url)
+        mix = request_mix(args.days)
+        # Warm the caches once so every level measures the same steady state
+        for prediction_type, date_str in mix:
+            requests.get(f"{base_url}/api/predictions", params={'type': prediction_type, 'date': date_str}, timeout=30)
+
+        levels = []
+        for clients in args.clients:
+            result = run_clients(base_url, clients, args.duration, mix)
+            levels.append(result)
+            latency = result['latency'] or {}
+            print(f"{clients:4} clients  {result['throughput_rps']:9.1f} req/s  "
+                  f"p50 {latency.get('p50_ms', 0):8.2f} ms  p99 {latency.get('p99_ms', 0):8.2f} ms  "
+                  f"errors {result['errors']}")
+    finally:
+        stop()
+
+    results = {
+        'target': args.target,
+        'workers': args.workers if args.target == 'gunicorn' else 1,
+        'levels': levels
+    }
+    print(f"Results written to {write_results(f'load_{args.target}', results, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Micro benchmarks for game generation, prediction scoring and ERA lookups.
+
+Each target is measured with cold caches (memory and disk cleared before
+every run) and warm caches (served from the in-memory layer).
+"""
+import argparse
+
+from benchmarks import measure, write_results
+from mlb_prediction_api import MLBPredictionAPI, PREDICTION_TYPES
+
+# A Friday, so the slate has the full 15 games
+DATE = '2025-06-06'
+
+
+def bench_generate_games(api, repeat):
+    stats_api = api.stats_api
+    return {
+        'cold': measure(lambda: stats_api.get_games_for_date(DATE), repeat, setup=lambda: clear(api)),
+        'warm': measure(lambda: stats_api.get_games_for_date(DATE), repeat),
+        'generate_only': measure(lambda: stats_api.generate_games_for_date(DATE), repeat)
+    }
+
+
+def bench_generate_predictions(api, repeat):
+    games = api.stats_api.get_games_for_date(DATE)
+    return {
+        'cold': measure(lambda: api.get_predictions(PREDICTION_TYPES[0], DATE), repeat, setup=lambda: clear(api)),
+        'warm': measure(lambda: api.get_predictions(PREDICTION_TYPES[0], DATE), repeat),
+        'score_one_type': measure(lambda: api._generate_predictions(games, PREDICTION_TYPES[0]), repeat),
+        'score_all_types': measure(lambda: api.engine.score(games), repeat)
+    }
+
+
+def bench_get_pitcher_era(api, repeat):
+    stats_api = api.stats_api
+    pitchers = [(record['team'], name) for name, record in stats_api.pitcher_database.items()]
+
+    def lookup_all():
+        for team, name in pitchers:
+            stats_api.get_pitcher_era(team, name)
+
+    return {
+        'pitchers_per_run': len(pitchers),
+        'cold': measure(lookup_all, repeat, setup=lambda: clear(api)),
+        'warm': measure(lookup_all, repeat)
+    }
+
+
+def clear(api):
+    """Empty every memory and disk cache used by the prediction API"""
+    api.clear_cache()
+    api.stats_api.clear_cache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50, help="runs per measurement")
+    parser.add_argument('--output', help="results file (default benchmarks/results/micro_<commit>.json)")
+    args = parser.parse_args()
+
+    api = MLBPredictionAPI()
+    results = {
+        'generate_games': bench_generate_games(api, args.repeat),
+        'generate_predictions': bench_generate_predictions(api, args.repeat),
+        'get_pitcher_era': bench_get_pitcher_era(api, args.repeat)
+    }
+
+    for target, cases in results.items():
+        for case, stats in cases.items():
+            if isinstance(stats, dict):
+                print(f"{target:22} {case:16} p50 {stats['p50_ms']:9.3f} ms   p90 {stats['p90_ms']:9.3f} ms")
+    print(f"Results written to {write_results('micro', results, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Cold start: app import, first response and gunicorn boot, each in fresh processes.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --workers 2 --repeat 3
+
+Every run uses its own empty cache directory, so the first request also
+pays for generating the slate, as it does on a freshly scaled-up instance.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+import requests
+
+from benchmarks import REPO_DIR, summarize, write_results
+from benchmarks.load import free_port
+
+# Runs in the child: times importing the app and serving its first request
+IMPORT_SCRIPT = """
+import json, resource, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/api/predictions?type=under_1_run_1st&date=2025-06-06')
+assert response.status_code == 200, response.status_code
+done = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - start,
+    'first_response_s': done - imported,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+}))
+"""
+
+
+def fresh_env(**overrides):
+    """Environment for a child process with its own empty cache and archive"""
+    cache_dir = tempfile.mkdtemp(prefix='mlb-bench-')
+    env = dict(os.environ, MLB_CACHE_DIR=cache_dir, MLB_ARCHIVE_DIR=os.path.join(cache_dir, 'archive'))
+    env.update(overrides)
+    return env
+
+
+def bench_import(repeat):
+    """Interpreter start to app imported, and the first (cold) response after that"""
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_SCRIPT], cwd=REPO_DIR, env=fresh_env(MLB_DEFER_SERVICES='1'),
+            check=True, capture_output=True, text=True
+        ).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    return {
+        'import': summarize([run['import_s'] for run in runs]),
+        'first_response': summarize([run['first_response_s'] for run in runs]),
+        'max_rss_kb': max(run['max_rss_kb'] for run in runs)
+    }
+
+
+def bench_gunicorn(repeat, workers, preload):
+    """Process start to the first successful response from gunicorn"""
+    samples = []
+    for _ in range(repeat):
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'app:app', '-w', str(workers), '-b', f'127.0.0.1:{port}',
+             '--log-level', 'warning'],
+            cwd=REPO_DIR, env=fresh_env(PRELOAD_APP='1' if preload else '0')
+        )
+        try:
+            while True:
+                try:
+                    if requests.get(f"{base_url}/api/cache", timeout=1).status_code == 200:
+                        break
+                except requests.RequestException:
+                    pass
+                if time.perf_counter() - start > 60:
+                    raise RuntimeError("gunicorn did not start within 60s")
+                time.sleep(0.01)
+            samples.append(time.perf_counter() - start)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument('--output', help="results file (default benchmarks/results/startup_<commit>.json)")
+    args = parser.parse_args()
+
+    results = {
+        'app': bench_import(args.repeat),
+        'gunicorn': {
+            'workers': args.workers,
+            'preload': bench_gunicorn(args.repeat, args.workers, preload=True),
+            'no_preload': bench_gunicorn(args.repeat, args.workers, preload=False)
+        }
+    }
+    app_results = results['app']
+    print(f"import app              p50 {app_results['import']['p50_ms']:9.1f} ms")
+    print(f"first response (cold)   p50 {app_results['first_response']['p50_ms']:9.1f} ms")
+    for mode in ('preload', 'no_preload'):
+        print(f"gunicorn {mode:14} p50 {results['gunicorn'][mode]['p50_ms']:9.1f} ms   ({args.workers} workers)")
+    print(f"Results written to {write_results('startup', results, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+from metrics import timed
+from records import to_cache_json
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; locking becomes a no-op there
+    fcntl = None
+
+# Root of every cache directory; MLB_CACHE_DIR moves it (e.g. to a temp dir for benchmarks)
+CACHE_ROOT = os.environ.get('MLB_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
+
+LOCK_DIR = os.path.join(CACHE_ROOT, 'locks')
+
+
+@contextmanager
+def file_lock(name, shared=False):
+    """Hold an advisory lock on cache/locks/<name>.lock across processes.
+
+    Writers take the lock exclusively; pass shared=True for readers that must
+    not observe a multi-step update half done.
+
+    The cache sweeper deletes idle lock files (see CacheManager), so a lock
+    taken on a file that has since been unlinked is dropped and taken again
+    on the file now at the path.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    path = os.path.join(LOCK_DIR, f"{name}.lock")
+    while True:
+        os.makedirs(LOCK_DIR, exist_ok=True)
+        with open(path, 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                if not is_same_file(f, path):
+                    continue
+                yield
+                return
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def is_same_file(f, path):
+    """Whether path still names the open file f (it may have been deleted or replaced)"""
+    try:
+        return os.stat(path).st_ino == os.fstat(f.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+
+@timed('mlb_json_write_seconds', "Time spent serializing and writing cache files")
+def write_json_atomic(path, data):
+    """Write JSON so readers only ever see the old or the complete new file.
+
+    Game and prediction records are written in their cache dict shape. The
+    data goes to a hidden temp file in the same directory, is flushed to
+    disk, and is then renamed over the target in one atomic step.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, default=to_cache_json)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+@timed('mlb_json_read_seconds', "Time spent reading and parsing cache files")
+def read_json(path, required=()):
+    """Read a JSON cache file, or return None if it is missing or corrupt.
+
+    A file that does not parse, is not an object, or lacks any of the
+    required keys is treated like a missing one so the caller recomputes
+    it; the rebuilt file then replaces it atomically.
+    """
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+    if not isinstance(data, dict) or any(key not in data for key in required):
+        return None
+    return data
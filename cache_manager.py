@@ -0,0 +1,164 @@
+import os
+import logging
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; lock files are then left alone
+    fcntl = None
+
+from cache_io import LOCK_DIR, is_same_file
+
+logger = logging.getLogger(__name__)
+
+# Lock files untouched for this long are removed if nobody holds them
+LOCK_TTL = 86400
+
+# Leftover temp files from interrupted atomic writes
+TEMP_TTL = 3600
+
+
+class CacheManager:
+    """Keeps the on-disk cache within a size budget and free of expired files.
+
+    sweep() first deletes files older than the TTL for their name prefix,
+    then deletes the oldest remaining files until the cache fits within
+    max_bytes and max_entries. A prefix with a TTL of None marks files that
+    manage their own freshness; they are never swept. start() runs sweep()
+    periodically on a daemon thread. Concurrent sweeps from several workers
+    are harmless.
+    """
+
+    def __init__(self, directories, ttls, max_bytes=50 * 1024 * 1024, max_entries=2000, default_ttl=86400):
+        self.directories = directories
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Totals exposed through usage()
+        self.expired = 0
+        self.evicted = 0
+        self.last_sweep = None
+
+    def ttl_for(self, name):
+        """Return the TTL for a cache file name, based on its prefix"""
+        if name.startswith('.') and name.endswith('.tmp'):
+            return TEMP_TTL
+        for prefix, ttl in self.ttls.items():
+            if name.startswith(prefix):
+                return ttl
+        return self.default_ttl
+
+    def usage(self):
+        """Report file counts and bytes per directory, plus sweep totals"""
+        directories = {}
+        for directory in self.directories + [LOCK_DIR]:
+            entries = self._scan(directory)
+            directories[os.path.basename(directory)] = {
+                'files': len(entries),
+                'bytes': sum(entry.stat().st_size for entry in entries)
+            }
+
+        return {
+            'directories': directories,
+            'files': sum(d['files'] for d in directories.values()),
+            'bytes': sum(d['bytes'] for d in directories.values()),
+            'max_bytes': self.max_bytes,
+            'max_entries': self.max_entries,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'last_sweep': self.last_sweep
+        }
+
+    def sweep(self):
+        """Delete expired files, then the oldest files beyond the budget"""
+        now = datetime.now().timestamp()
+        expired = 0
+        evicted = 0
+
+        # Expired entries
+        remaining = []
+        for directory in self.directories:
+            for entry in self._scan(directory):
+                ttl = self.ttl_for(entry.name)
+                if ttl is None:
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime >= ttl:
+                    expired += self._remove(entry.path)
+                else:
+                    remaining.append((stat.st_mtime, stat.st_size, entry.path))
+
+        # Oldest entries first until we are within budget
+        remaining.sort()
+        total_bytes = sum(size for _, size, _ in remaining)
+        total_entries = len(remaining)
+        for _, size, path in remaining:
+            if total_bytes <= self.max_bytes and total_entries <= self.max_entries:
+                break
+            evicted += self._remove(path)
+            total_bytes -= size
+            total_entries -= 1
+
+        self._sweep_locks(now)
+
+        self.expired += expired
+        self.evicted += evicted
+        self.last_sweep = now
+        return {'expired': expired, 'evicted': evicted}
+
+    def start(self, interval=300):
+        """Run sweep() every interval seconds on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(interval,), name='cache-sweeper', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Error sweeping cache")
+
+    def _sweep_locks(self, now):
+        """Remove stale lock files that no process currently holds.
+
+        A file is only removed while this holds its lock, and only if it is
+        still the file at its path; file_lock() re-checks the same after
+        acquiring, so a waiter on a removed file never shares the lock.
+        """
+        if fcntl is None:
+            return
+
+        for entry in self._scan(LOCK_DIR):
+            try:
+                if now - entry.stat().st_mtime < LOCK_TTL or entry.name == 'prewarm.leader':
+                    continue
+                with open(entry.path, 'a') as f:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    if is_same_file(f, entry.path):
+                        os.remove(entry.path)
+            except OSError:
+                continue
+
+    def _scan(self, directory):
+        """List the regular files in a directory"""
+        try:
+            return [entry for entry in os.scandir(directory) if entry.is_file()]
+        except FileNotFoundError:
+            return []
+
+    def _remove(self, path):
+        """Delete a file; returns 1 if it was deleted"""
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,32 @@
+class DependencyGraph:
+    """Directed graph from cache inputs to the entries derived from them.
+
+    Nodes are tuples such as ('pitcher', team, name), ('games', date) and
+    ('predictions', date, prediction_type). An edge input -> entry means the
+    entry has to be invalidated when the input changes.
+    """
+
+    def __init__(self):
+        self._dependents = {}
+
+    def add(self, node, depends_on):
+        """Record that node was derived from each of the depends_on nodes"""
+        self._dependents.setdefault(node, set())
+        for dependency in depends_on:
+            self._dependents.setdefault(dependency, set()).add(node)
+
+    def nodes(self, kind=None):
+        """Return every node, optionally only those of one kind"""
+        return [node for node in self._dependents if kind is None or node[0] == kind]
+
+    def dependents(self, roots):
+        """Return every node transitively derived from the roots (roots included)"""
+        seen = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.extend(self._dependents.get(node, ()))
+        return seen
@@ -0,0 +1,26 @@
+"""gunicorn settings, loaded automatically by `gunicorn app:app` from this directory.
+
+The app is preloaded by default (PRELOAD_APP=0 turns it off): the master
+imports it and builds the shared services once, then forks workers that
+start with all of it in memory instead of each importing and building it
+again. That keeps worker boot fast when the platform scales workers up or
+restarts them.
+"""
+import os
+
+import services
+
+preload_app = os.environ.get('PRELOAD_APP', '1') == '1'
+
+# Threads started in the master would not survive the fork, so app.py leaves
+# the sweeper and prewarm threads to post_fork
+os.environ.setdefault('MLB_DEFER_SERVICES', '1')
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        services.preload()
+
+
+def post_fork(server, worker):
+    services.start_background_services()
@@ -0,0 +1,143 @@
+import os
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from cache_io import read_json, write_json_atomic
+from metrics import timed
+from records import to_json
+
+
+class TTLCache:
+    """Bounded in-memory LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None, version=None):
+        """Return the cached value for key, or default on a miss.
+
+        When version is given, an entry stored under a different version
+        counts as a miss and is dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, timestamp, entry_version = entry
+            expired = self.ttl is not None and datetime.now().timestamp() - timestamp >= self.ttl
+            if expired or entry_version != version:
+                del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, timestamp=None, version=None):
+        """Store a value; timestamp is when the value was produced (defaults to now)"""
+        if timestamp is None:
+            timestamp = datetime.now().timestamp()
+
+        with self._lock:
+            self._entries[key] = (value, timestamp, version)
+            self._entries.move_to_end(key)
+
+            # Evict least recently used entries beyond the size bound
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Remove an entry and return its value"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None else default
+
+    def clear(self):
+        """Remove every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current size"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class SerializedPayload:
+    """A JSON response body serialized and gzip-compressed once, with its ETag.
+
+    data may contain game and prediction records; they are serialized in
+    their API dict shape.
+    """
+
+    @timed('mlb_json_serialize_seconds', "Time spent serializing and compressing response payloads")
+    def __init__(self, data, timestamp):
+        self.body = json.dumps(data, separators=(',', ':'), default=to_json).encode('utf-8')
+        self.gzip_body = gzip.compress(self.body, compresslevel=6)
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self.timestamp = timestamp
+
+
+def load_cached_json(cache, key, path, required=(), decode=None):
+    """Load a JSON cache file through an in-memory TTLCache.
+
+    The decoded data is kept in memory together with the file's mtime, so a
+    hit costs a single stat() instead of open/json.load. A file that was
+    rewritten or deleted (e.g. by another worker) is treated as a miss.
+    Returns None when the file is missing, corrupt (see read_json) or older
+    than the cache TTL, so the caller recomputes it. decode, if given,
+    turns the data read from the file into what is kept in memory (e.g.
+    records instead of dicts).
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    data = cache.get(key, version=mtime)
+    if data is not None or mtime is None:
+        return data
+
+    data = read_json(path, required=('timestamp',) + tuple(required))
+    if data is None:
+        return None
+
+    if cache.ttl is not None and datetime.now().timestamp() - data['timestamp'] >= cache.ttl:
+        return None
+
+    if decode is not None:
+        data = decode(data)
+
+    cache.set(key, data, timestamp=data['timestamp'], version=mtime)
+    return data
+
+
+def store_cached_json(cache, key, path, data):
+    """Write a JSON cache file atomically and keep the decoded data in memory"""
+    write_json_atomic(path, data)
+
+    cache.set(key, data, timestamp=data['timestamp'], version=os.stat(path).st_mtime_ns)
@@ -0,0 +1,116 @@
+"""Prometheus-style metrics for the prediction service.
+
+Set METRICS_ENABLED=0 to turn metrics off. When off, @timed returns the
+decorated function unchanged, so instrumented hot paths pay nothing.
+"""
+import os
+import threading
+import time
+from functools import wraps
+
+ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative histogram of observed values, one series per label set"""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        """Record one observation for the given label values"""
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labelvalues, (counts, total, count) in sorted(self._series.items()):
+                labels = _labels(zip(self.labelnames, labelvalues))
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_labels(zip(self.labelnames, labelvalues), le=bound)} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_labels(zip(self.labelnames, labelvalues), le='+Inf')} {count}")
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Holds histograms and callback metrics and renders them as Prometheus text"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help_text, labelnames=()):
+        """Get or create a histogram"""
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, help_text, labelnames)
+            return self._histograms[name]
+
+    def register_callback(self, name, metric_type, help_text, collect):
+        """Add a counter or gauge whose samples are read at scrape time.
+
+        collect() returns a list of (labels dict, value) pairs.
+        """
+        self._callbacks.append((name, metric_type, help_text, collect))
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        for histogram in list(self._histograms.values()):
+            lines.extend(histogram.render())
+        for name, metric_type, help_text, collect in self._callbacks:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in collect():
+                lines.append(f"{name}{_labels(labels.items())} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def timed(name, help_text):
+    """Decorator recording a function's run time in a histogram (a no-op when metrics are off)"""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        histogram = REGISTRY.histogram(name, help_text)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _labels(pairs, **extra):
+    """Format label pairs as {a="1",b="2"} (empty string when there are none)"""
+    items = [(k, v) for k, v in pairs] + list(extra.items())
+    if not items:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in items)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + '}'
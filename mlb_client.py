@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from zoneinfo import ZoneInfo
+    EASTERN = ZoneInfo('America/New_York')
+except Exception:  # No tz database available; fall back to EDT
+    EASTERN = timezone(timedelta(hours=-4))
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = 'https://statsapi.mlb.com/api/v1'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the MLB Stats API while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a failing upstream for a while after repeated failures.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    are refused for reset_timeout seconds. The first call after that is let
+    through as a trial: success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may be made now"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: let one trial call through
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'open' if time.monotonic() - self.opened_at < self.reset_timeout else 'half-open'
+
+
+class MLBStatsClient:
+    """Pooled, concurrent client for the MLB Stats API.
+
+    One keep-alive session with a connection pool is shared by all calls.
+    Transient errors are retried with exponential backoff, and a circuit
+    breaker stops hammering the API when it is down. A slate costs one
+    schedule call plus one parallel fan-out for the probable pitchers' stats.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=5, max_workers=8, retries=3, backoff=0.3):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.breaker = CircuitBreaker()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mlb-client')
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET'])
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _get(self, path, params=None, critical=True):
+        """GET a JSON document from the API through the circuit breaker.
+
+        Any failure of a critical call counts against the breaker. For other
+        calls only outages do (connection errors, timeouts, exhausted retries,
+        5xx); a 404 or a malformed document for one pitcher counts as neither
+        a failure nor a success, so it cannot reset the failure count or
+        close a half-open circuit.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"MLB Stats API circuit is open; not calling {path}")
+
+        try:
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            if critical or _is_outage(e):
+                self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        return data
+
+    def get_schedule(self, date_str):
+        """Get the games and probable pitchers scheduled for a date"""
+        data = self._get('/schedule', {
+            'sportId': 1,
+            'date': date_str,
+            'hydrate': 'probablePitcher,venue'
+        })
+
+        games = []
+        for day in data.get('dates', []):
+            for game in day.get('games', []):
+                home = game['teams']['home']
+                away = game['teams']['away']
+                games.append({
+                    'home_team': home['team']['name'],
+                    'away_team': away['team']['name'],
+                    'stadium': game.get('venue', {}).get('name', "Unknown Stadium"),
+                    'time': _format_game_time(game.get('gameDate')),
+                    'home_pitcher': _probable_pitcher(home),
+                    'away_pitcher': _probable_pitcher(away)
+                })
+        return games
+
+    def get_pitcher_era(self, pitcher_id, season):
+        """Get a pitcher's season ERA, or None if he has no pitching line yet"""
+        data = self._get(f"/people/{pitcher_id}/stats", {
+            'stats': 'season',
+            'group': 'pitching',
+            'season': season
+        }, critical=False)
+
+        for stats in data.get('stats', []):
+            for split in stats.get('splits', []):
+                try:
+                    return float(split['stat']['era'])
+                except (KeyError, TypeError, ValueError):
+                    return None
+        return None
+
+    def get_pitcher_eras(self, pitcher_ids, season):
+        """Get ERAs for many pitchers concurrently; returns {pitcher_id: era}.
+
+        A pitcher whose stats cannot be fetched gets None, like one without a
+        pitching line, so one bad request does not cost the whole slate.
+        """
+        def fetch(pitcher_id):
+            try:
+                return self.get_pitcher_era(pitcher_id, season)
+            except (requests.RequestException, ValueError, CircuitOpenError) as e:
+                logger.warning(f"Could not fetch stats for pitcher {pitcher_id}: {e}")
+                return None
+
+        pitcher_ids = list(dict.fromkeys(pitcher_ids))
+        return dict(zip(pitcher_ids, self.executor.map(fetch, pitcher_ids)))
+
+    def get_slate(self, date_str):
+        """Get a date's games with probable pitchers and their ERAs"""
+        games = self.get_schedule(date_str)
+
+        pitcher_ids = [
+            pitcher['id']
+            for game in games
+            for pitcher in (game['home_pitcher'], game['away_pitcher'])
+            if pitcher is not None
+        ]
+        eras = self.get_pitcher_eras(pitcher_ids, date_str[:4])
+
+        for game in games:
+            for side in ('home', 'away'):
+                pitcher = game[f"{side}_pitcher"]
+                game[f"{side}_era"] = eras.get(pitcher['id']) if pitcher is not None else None
+        return games
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+
+def _is_outage(error):
+    """Whether a request error means the API is unreachable or failing, rather than refusing one request"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError)):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code >= 500
+
+
+def _probable_pitcher(team_side):
+    """Return {'id', 'name'} for a team's probable pitcher, or None if not announced"""
+    pitcher = team_side.get('probablePitcher')
+    if not pitcher:
+        return None
+    return {'id': pitcher['id'], 'name': pitcher['fullName']}
+
+
+def _format_game_time(game_date):
+    """Format an ISO UTC game date as the Eastern time shown in the UI"""
+    if not game_date:
+        return "TBD"
+    start = datetime.strptime(game_date, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+    return start.astimezone(EASTERN).strftime('%I:%M %p')
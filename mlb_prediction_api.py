@@ -1,167 +1,285 @@
 import os
-import json
-import random
+import logging
+import threading
+import multiprocessing
 from datetime import datetime, timedelta
 from mlb_stats_api import MLBStatsAPI
+from memory_cache import TTLCache, SerializedPayload, load_cached_json, store_cached_json
+from single_flight import SingleFlight
+from cache_io import CACHE_ROOT, file_lock, read_json, write_json_atomic
+from dependency_graph import DependencyGraph
+from metrics import timed
+from prediction_engine import PREDICTION_TYPES, build_engine
+from prediction_archive import PredictionArchive
+from records import Prediction
+from reference_data import BALLPARK_FACTORS, FACTOR_WEIGHTS
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Longest date range served by get_predictions_range and iter_predictions
+MAX_RANGE_DAYS = 62
+MAX_STREAM_DAYS = 366
+
+# Process pool for building date ranges, created on first use
+_executor = None
+_executor_lock = threading.Lock()
+
+# Per-process API instance used by pool workers
+_worker_api = None
 
 class MLBPredictionAPI:
-    def __init__(self):
-        self.stats_api = MLBStatsAPI()
-        self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'predictions')
+    def __init__(self, stats_api=None):
+        # Pass the process's shared MLBStatsAPI so both use the same caches
+        self.stats_api = stats_api if stats_api is not None else MLBStatsAPI()
+        self.cache_dir = os.path.join(CACHE_ROOT, 'predictions')
         os.makedirs(self.cache_dir, exist_ok=True)
         
+        # Decoded prediction files, keyed by date
+        self.memory_cache = TTLCache(maxsize=64, ttl=900)  # Cache for 15 minutes
+        
+        # Serialized and gzip-compressed responses, keyed by (date, type)
+        self.payload_cache = TTLCache(maxsize=192, ttl=900)
+        
+        # Coalesces concurrent rebuilds of the same date
+        self.single_flight = SingleFlight()
+        
+        # Games reused from / scored into the per-game prediction files
+        self.game_prediction_counts = {'hits': 0, 'misses': 0}
+        
+        # Shared by every prediction; built on first use
+        self._factor_breakdown = None
+        
+        # Every newly scored prediction is appended to the archive (ARCHIVE_ENABLED=0 turns it off)
+        self.archive = PredictionArchive() if os.environ.get('ARCHIVE_ENABLED', '1') == '1' else None
+        
         # Factors that influence predictions
-        self.factors = {
-            'pitcher_performance': 0.25,
-            'bullpen_performance': 0.15,
-            'batter_vs_pitcher': 0.15,
-            'ballpark_factors': 0.10,
-            'team_offense': 0.10,
-            'team_defense': 0.05,
-            'weather_conditions': 0.05,
-            'umpire_tendencies': 0.05,
-            'travel_fatigue': 0.05,
-            'momentum': 0.05
-        }
+        self.factors = FACTOR_WEIGHTS
         
         # Ballpark factors (higher = more hitter-friendly)
-        self.ballpark_factors = {
-            'Coors Field': 1.3,
-            'Great American Ball Park': 1.2,
-            'Citizens Bank Park': 1.15,
-            'Yankee Stadium': 1.1,
-            'Fenway Park': 1.1,
-            'Wrigley Field': 1.05,
-            'Chase Field': 1.05,
-            'Globe Life Field': 1.0,
-            'Truist Park': 1.0,
-            'Minute Maid Park': 1.0,
-            'Kauffman Stadium': 0.95,
-            'Dodger Stadium': 0.95,
-            'Nationals Park': 0.95,
-            'Rogers Centre': 0.95,
-            'Angel Stadium': 0.95,
-            'Target Field': 0.95,
-            'Comerica Park': 0.9,
-            'PNC Park': 0.9,
-            'Busch Stadium': 0.9,
-            'loanDepot park': 0.9,
-            'Oracle Park': 0.85,
-            'Petco Park': 0.85,
-            'T-Mobile Park': 0.85,
-            'Oakland Coliseum': 0.85,
-            'Tropicana Field': 0.85,
-            'Oriole Park at Camden Yards': 0.95,
-            'Progressive Field': 0.95,
-            'American Family Field': 1.05,
-            'Citi Field': 0.95,
-            'Rate Field': 1.05
-        }
+        self.ballpark_factors = BALLPARK_FACTORS
+        
+        # Vectorized scoring of whole slates; PREDICTION_MODEL=simulation uses the Monte Carlo model
+        self.engine = build_engine(self.ballpark_factors, self._generate_factor_breakdown)
     
     def get_predictions(self, prediction_type, date_str):
         """Get predictions for a specific type and date"""
-        cache_file = os.path.join(self.cache_dir, f"all_predictions_{date_str}.json")
+        return self.get_all_predictions(date_str)[prediction_type]
+    
+    def get_all_predictions(self, date_str):
+        """Get predictions of every type for a date, keyed by prediction type"""
+        return self._get_prediction_data(date_str)['predictions']
+    
+    def get_predictions_payload(self, prediction_type, date_str):
+        """Get predictions for a type and date as a pre-serialized, pre-compressed payload"""
+        data = self._get_prediction_data(date_str)
+        
+        # Serialized bytes are reused until the underlying cache entry is rebuilt
+        payload = self.payload_cache.get((date_str, prediction_type), version=data['timestamp'])
+        if payload is None:
+            payload = SerializedPayload(data['predictions'][prediction_type], data['timestamp'])
+            self.payload_cache.set((date_str, prediction_type), payload, timestamp=data['timestamp'], version=data['timestamp'])
+        
+        return payload
+    
+    def has_predictions(self, date_str):
+        """Whether a date's predictions are cached, so serving them builds nothing"""
+        datetime.strptime(date_str, '%Y-%m-%d')
+        data = self._load_cached_predictions(date_str)
+        return data is not None and all(t in data['predictions'] for t in PREDICTION_TYPES)
+    
+    def _get_prediction_data(self, date_str, force_refresh=False):
+        """Get the cached predictions entry ({'predictions', 'timestamp'}) for a date"""
+        # Validate the date before it is used in cache and lock file names
+        datetime.strptime(date_str, '%Y-%m-%d')
+        cache_file = self._cache_file(date_str)
         
         # Check if we have cached data
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-                if datetime.now().timestamp() - data['timestamp'] < 900:  # Cache for 15 minutes
-                    if prediction_type in data['predictions']:
-                        return data['predictions'][prediction_type]
+        if not force_refresh:
+            data = self._load_cached_predictions(date_str)
+            if data is not None and all(t in data['predictions'] for t in PREDICTION_TYPES):
+                return data
+        
+        # Build once for all concurrent callers (threads and workers)
+        return self.single_flight.do(
+            ('predictions', date_str, force_refresh),
+            lambda: self._build_predictions(date_str, cache_file, force_refresh),
+            lock_name=f"predictions_{date_str}"
+        )
+    
+    def prewarm(self, date_str, margin):
+        """Rebuild a date's games and predictions if they expire within margin seconds"""
+        now = datetime.now().timestamp()
+        
+        games_data = self.stats_api.load_cached_games(date_str)
+        games_expiring = games_data is None or now - games_data['timestamp'] >= self.stats_api.games_cache.ttl - margin
+        if games_expiring:
+            self.stats_api.get_games_for_date(date_str, force_refresh=True)
+        
+        data = self._load_cached_predictions(date_str)
+        if games_expiring or data is None or now - data['timestamp'] >= self.memory_cache.ttl - margin:
+            self._get_prediction_data(date_str, force_refresh=True)
+    
+    def get_predictions_range(self, start_str, end_str, prediction_types=PREDICTION_TYPES):
+        """Get predictions for every date from start to end (inclusive).
+        
+        Cached dates are served from the prediction cache; missing dates are
+        built in parallel on a process pool. Returns {date: {type: [...]}}.
+        """
+        dates = date_range(start_str, end_str, MAX_RANGE_DAYS)
+        
+        # Serve what we can from the cache
+        results = {}
+        missing = []
+        for date_str in dates:
+            data = self._load_cached_predictions(date_str)
+            if data is not None and all(t in data['predictions'] for t in PREDICTION_TYPES):
+                results[date_str] = data['predictions']
+            else:
+                missing.append(date_str)
+        
+        # Build the rest, in parallel when there is more than one
+        if len(missing) > 1:
+            results.update(zip(missing, _build_dates_in_parallel(missing, self)))
+        else:
+            for date_str in missing:
+                results[date_str] = self.get_all_predictions(date_str)
+        
+        return {
+            date_str: {t: results[date_str][t] for t in prediction_types}
+            for date_str in dates
+        }
+    
+    def iter_predictions(self, start_str, end_str, prediction_types=PREDICTION_TYPES):
+        """Yield one prediction per game as each date is served or built.
+        
+        Dates are validated up front, then produced lazily one at a time, so
+        memory stays flat however long the range is. Each item is the usual
+        prediction dict plus its 'date' and 'type'.
+        """
+        dates = date_range(start_str, end_str, MAX_STREAM_DAYS)
+        return self._iter_dates(dates, prediction_types)
+    
+    def _iter_dates(self, dates, prediction_types):
+        """Generator behind iter_predictions"""
+        for date_str in dates:
+            all_predictions = self.get_all_predictions(date_str)
+            for prediction_type in prediction_types:
+                for prediction in all_predictions[prediction_type]:
+                    yield dict(prediction.to_dict(), date=date_str, type=prediction_type)
+    
+    def _load_cached_predictions(self, date_str):
+        """Cached predictions entry for a date with Prediction records, or None"""
+        return load_cached_json(self.memory_cache, date_str, self._cache_file(date_str), required=('predictions',),
+                                decode=self._decode_predictions)
+    
+    def _decode_predictions(self, data):
+        """Turn a predictions file's dicts into records, one shared Game per matchup"""
+        games = {}
+        predictions = {}
+        for prediction_type, items in data['predictions'].items():
+            predictions[prediction_type] = []
+            for item in items:
+                key = (item['home_team'], item['away_team'], item['time'])
+                prediction = Prediction.from_dict(item, prediction_type, self._generate_factor_breakdown(None, prediction_type), games.get(key))
+                games[key] = prediction.game
+                predictions[prediction_type].append(prediction)
+        return dict(data, predictions=predictions)
+    
+    def _cache_file(self, date_str):
+        """Path of the predictions cache file for a date"""
+        return os.path.join(self.cache_dir, f"all_predictions_{date_str}.json")
+    
+    def _build_predictions(self, date_str, cache_file, force_refresh=False):
+        """Generate and cache predictions of every type for a date"""
+        # Another worker may have built the file while we waited for the lock
+        if not force_refresh:
+            data = self._load_cached_predictions(date_str)
+            if data is not None and all(t in data['predictions'] for t in PREDICTION_TYPES):
+                return data
         
         # Get games for the date
         games = self.stats_api.get_games_for_date(date_str)
         
-        # Generate predictions for all types
-        all_predictions = {
-            'under_1_run_1st': self._generate_predictions(games, 'under_1_run_1st'),
-            'over_2.5_runs_3': self._generate_predictions(games, 'over_2.5_runs_3'),
-            'over_3.5_runs_3': self._generate_predictions(games, 'over_3.5_runs_3')
-        }
+        # Score only the games whose inputs changed since the last build
+        all_predictions = self._score_games(date_str, games)
         
         # Cache the result
-        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-        with open(cache_file, 'w') as f:
-            json.dump({
-                'predictions': all_predictions,
-                'timestamp': datetime.now().timestamp()
-            }, f)
+        data = {
+            'predictions': all_predictions,
+            'timestamp': datetime.now().timestamp()
+        }
+        store_cached_json(self.memory_cache, date_str, cache_file, data)
         
-        return all_predictions[prediction_type]
+        return data
     
-    def _generate_predictions(self, games, prediction_type):
-        """Generate predictions for games based on the prediction type"""
-        predictions = []
+    def _game_cache_file(self, date_str):
+        """Path of the per-game predictions file for a date"""
+        return os.path.join(self.cache_dir, f"game_predictions_{date_str}.json")
+    
+    @timed('mlb_score_games_seconds', "Time spent scoring a slate, reusing stored per-game scores")
+    def _score_games(self, date_str, games):
+        """Score a slate, reusing per-game scores whose input fingerprint is unchanged.
         
-        for game in games:
-            # Calculate base probability based on pitcher ERAs
-            home_era = float(game['home_era']) if game['home_era'] != 'N/A' else 4.50
-            away_era = float(game['away_era']) if game['away_era'] != 'N/A' else 4.50
-            
-            # Adjust probability based on prediction type
-            if prediction_type == 'under_1_run_1st':
-                # Lower ERAs = higher probability of under 1 run
-                base_prob = 0.5 - (((home_era + away_era) / 2 - 4.0) * 0.05)
-                
-                # Adjust for ballpark factors
-                ballpark_factor = self.ballpark_factors.get(game['stadium'], 1.0)
-                base_prob -= (ballpark_factor - 1.0) * 0.2
-                
-            elif prediction_type == 'over_2.5_runs_3':
-                # Higher ERAs = higher probability of over 2.5 runs
-                base_prob = 0.5 + (((home_era + away_era) / 2 - 4.0) * 0.05)
-                
-                # Adjust for ballpark factors
-                ballpark_factor = self.ballpark_factors.get(game['stadium'], 1.0)
-                base_prob += (ballpark_factor - 1.0) * 0.2
-                
-            elif prediction_type == 'over_3.5_runs_3':
-                # Higher ERAs = higher probability of over 3.5 runs
-                base_prob = 0.4 + (((home_era + away_era) / 2 - 4.0) * 0.05)
-                
-                # Adjust for ballpark factors
-                ballpark_factor = self.ballpark_factors.get(game['stadium'], 1.0)
-                base_prob += (ballpark_factor - 1.0) * 0.2
-            
-            # Ensure probability is between 0.4 and 0.7
-            base_prob = max(0.4, min(0.7, base_prob))
-            
-            # Add some randomness for variety
-            random.seed(hash(f"{game['home_team']}_{game['away_team']}_{prediction_type}"))
-            final_prob = base_prob + (random.random() - 0.5) * 0.1
-            final_prob = round(final_prob * 100, 1)
-            
-            # Determine rating based on probability
-            if final_prob >= 60:
-                rating = "Bet"
-            elif final_prob >= 52:
-                rating = "Lean"
-            else:
-                rating = "Pass"
-            
-            # Create prediction object
-            prediction = {
-                'home_team': game['home_team'],
-                'away_team': game['away_team'],
-                'stadium': game['stadium'],
-                'time': game['time'],
-                'home_pitcher': game['home_pitcher'],
-                'away_pitcher': game['away_pitcher'],
-                'home_era': game['home_era'],
-                'away_era': game['away_era'],
-                'probability': final_prob,
-                'rating': rating,
-                'factors': self._generate_factor_breakdown(game, prediction_type),
-                'data_source': game['home_era_source']
-            }
-            
-            predictions.append(prediction)
+        Each game's probability and rating per type are stored under a
+        fingerprint of its inputs (teams, time, pitchers, ERAs) and the model,
+        so a pitcher scratch or ERA update re-scores only the games it
+        touches. Called under the date's build lock.
+        """
+        game_file = self._game_cache_file(date_str)
+        previous = read_json(game_file, required=('scores',))
+        previous = previous['scores'] if previous is not None else {}
+        
+        fingerprints = [self.engine.fingerprint(game) for game in games]
+        scores = {fp: previous[fp] for fp in fingerprints if fp in previous}
+        changed = [(fp, game) for fp, game in zip(fingerprints, games) if fp not in scores]
+        
+        if changed:
+            scored = self.engine.score([game for _, game in changed])
+            for i, (fp, _) in enumerate(changed):
+                scores[fp] = {t: [scored[t][i].probability, scored[t][i].rating] for t in PREDICTION_TYPES}
+            self._archive(date_str, scored)
+        self.game_prediction_counts['hits'] += len(games) - len(changed)
+        self.game_prediction_counts['misses'] += len(changed)
         
-        return predictions
+        # Only this slate's games are kept, so scratched games drop out
+        if changed or len(scores) != len(previous):
+            write_json_atomic(game_file, {'scores': scores, 'timestamp': datetime.now().timestamp()})
+        
+        return {
+            t: [
+                Prediction(game, t, *scores[fp][t], self._generate_factor_breakdown(game, t))
+                for fp, game in zip(fingerprints, games)
+            ]
+            for t in PREDICTION_TYPES
+        }
+    
+    def _archive(self, date_str, predictions):
+        """Append newly scored predictions to the archive; failures never fail the build"""
+        if self.archive is None:
+            return
+        try:
+            self.archive.append(date_str, predictions)
+        except (OSError, ValueError):
+            logger.exception(f"Error archiving predictions for {date_str}")
+    
+    def _generate_predictions(self, games, prediction_type):
+        """Generate predictions for games based on the prediction type"""
+        return self.engine.score(games, (prediction_type,))[prediction_type]
     
     def _generate_factor_breakdown(self, game, prediction_type):
-        """Generate a breakdown of factors influencing the prediction"""
+        """Breakdown of factors influencing the prediction.
+        
+        The factors do not depend on the game or type yet, so one list is
+        built and shared by every prediction; treat it as read-only.
+        """
+        if self._factor_breakdown is None:
+            self._factor_breakdown = self._build_factor_breakdown()
+        return self._factor_breakdown
+    
+    def _build_factor_breakdown(self):
+        """Generate a breakdown of factors influencing predictions"""
         factors = []
         
         # Pitcher Performance
@@ -189,10 +307,183 @@ class MLBPredictionAPI:
         
         return factors
     
+    def invalidate(self, date_str=None, prediction_type=None, pitcher=None, team=None, rebuild=False):
+        """Invalidate cached games and predictions by date, prediction type and/or pitcher.
+        
+        Only entries derived from the given scope are dropped. A pitcher has
+        its ERA refreshed in the cached slates that use it and invalidates the
+        predictions built from them, which then re-score only the affected
+        games; a prediction type drops only that type's predictions and
+        keeps the games. With rebuild=True the affected dates are rebuilt on a
+        background thread instead of being left cold. Returns the affected dates.
+        """
+        if date_str is not None:
+            datetime.strptime(date_str, '%Y-%m-%d')
+        
+        graph = self._dependency_graph()
+        if pitcher is not None:
+            # Pick up the pitcher's new numbers before anything is rebuilt
+            self.stats_api.pitcher_store.refresh(force=True, pitcher=pitcher, team=team)
+            roots = [node for node in graph.nodes('pitcher') if node[2] == pitcher and (team is None or node[1] == team)]
+        else:
+            roots = graph.nodes('games') + graph.nodes('predictions')
+        nodes = graph.dependents(roots)
+        
+        # Narrow to the requested date and prediction type
+        if date_str is not None:
+            nodes = {node for node in nodes if node[0] != 'pitcher' and node[1] == date_str}
+        if prediction_type is not None:
+            nodes = {node for node in nodes if node[0] == 'predictions' and node[2] == prediction_type}
+        
+        # A pitcher's new ERA is patched into cached slates; other scopes drop them
+        pitchers = {(node[1], node[2]) for node in roots} if pitcher is not None else None
+        
+        stale_types = {}
+        for node in nodes:
+            if node[0] == 'games':
+                if pitchers is None or self.stats_api.refresh_game_eras(node[1], pitchers) is None:
+                    self.stats_api.invalidate_games(node[1])
+            elif node[0] == 'predictions':
+                stale_types.setdefault(node[1], set()).add(node[2])
+        for stale_date, types in stale_types.items():
+            self._invalidate_predictions(stale_date, types)
+        
+        dates = sorted({node[1] for node in nodes if node[0] != 'pitcher'})
+        if rebuild and dates:
+            threading.Thread(target=self._rebuild_dates, args=(dates,), daemon=True).start()
+        
+        return dates
+    
+    def _dependency_graph(self):
+        """Build the pitcher -> games -> predictions graph from the cache files"""
+        graph = DependencyGraph()
+        
+        for date_str, games in self.stats_api.cached_games():
+            graph.add(('games', date_str), [node for game in games for node in _pitcher_nodes(game)])
+            for prediction_type in PREDICTION_TYPES:
+                graph.add(('predictions', date_str, prediction_type), [('games', date_str)])
+        
+        for date_str, all_predictions in self._cached_predictions():
+            for prediction_type, predictions in all_predictions.items():
+                pitchers = [node for prediction in predictions for node in _pitcher_nodes(prediction)]
+                graph.add(('predictions', date_str, prediction_type), [('games', date_str)] + pitchers)
+        
+        return graph
+    
+    def _cached_predictions(self):
+        """Yield (date, predictions by type) for every date in the cache directory"""
+        for entry in os.scandir(self.cache_dir):
+            if not (entry.name.startswith('all_predictions_') and entry.name.endswith('.json')):
+                continue
+            data = read_json(entry.path, required=('predictions',))
+            if data is not None:
+                yield entry.name[len('all_predictions_'):-len('.json')], data['predictions']
+    
+    def _invalidate_predictions(self, date_str, prediction_types):
+        """Drop some or all prediction types cached for a date"""
+        cache_file = self._cache_file(date_str)
+        
+        # Hold the build lock so a concurrent rebuild cannot write stale data back
+        with file_lock(f"predictions_{date_str}"):
+            self.memory_cache.pop(date_str)
+            data = read_json(cache_file, required=('predictions', 'timestamp'))
+            if data is not None and not set(prediction_types) >= set(PREDICTION_TYPES):
+                for prediction_type in prediction_types:
+                    data['predictions'].pop(prediction_type, None)
+                write_json_atomic(cache_file, data)
+                return
+            
+            # Every type is stale (or the file is unreadable): drop the whole entry
+            try:
+                os.remove(cache_file)
+            except FileNotFoundError:
+                pass
+    
+    def _rebuild_dates(self, dates):
+        """Rebuild invalidated dates so the next request finds them warm"""
+        for date_str in dates:
+            try:
+                self.get_all_predictions(date_str)
+            except Exception:
+                logger.exception(f"Error rebuilding predictions for {date_str}")
+    
     def clear_cache(self):
         """Clear the cache directory"""
+        self.memory_cache.clear()
+        self.payload_cache.clear()
         if os.path.exists(self.cache_dir):
-            for file in os.listdir(self.cache_dir):
-                file_path = os.path.join(self.cache_dir, file)
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file():
+                    os.remove(entry.path)
+
+
+def _pitcher_nodes(game):
+    """Dependency graph nodes for the two starting pitchers of a game or prediction"""
+    return [('pitcher', game['home_team'], game['home_pitcher']), ('pitcher', game['away_team'], game['away_pitcher'])]
+
+
+def date_range(start_str, end_str, max_days):
+    """Validate a date range and return its dates as YYYY-MM-DD strings"""
+    start = datetime.strptime(start_str, '%Y-%m-%d')
+    end = datetime.strptime(end_str, '%Y-%m-%d')
+    if end < start:
+        raise ValueError("end date is before start date")
+    if (end - start).days + 1 > max_days:
+        raise ValueError(f"date range is limited to {max_days} days")
+    
+    return [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range((end - start).days + 1)]
+
+
+def _get_worker_api():
+    """The API instance of this pool worker, built on first use"""
+    global _worker_api
+    if _worker_api is None:
+        _worker_api = MLBPredictionAPI()
+    return _worker_api
+
+
+def _build_date(date_str):
+    """Build predictions for one date inside a pool worker"""
+    return _get_worker_api().get_all_predictions(date_str)
+
+
+def warm_date(date_str):
+    """Build and cache predictions for one date inside a pool worker; returns the entry's timestamp.
+
+    Unlike _build_date nothing is sent back but the timestamp: the caller
+    reads the entry from the cache the worker wrote.
+    """
+    return _get_worker_api()._get_prediction_data(date_str)['timestamp']
+
+
+def build_executor():
+    """The process pool that builds dates, created on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Workers start from a fresh process rather than a fork of this one, so
+            # they do not inherit (and hold open) the server's client sockets
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(method))
+        return _executor
+
+
+def reset_build_executor():
+    """Drop a broken pool so the next build_executor() starts a fresh one"""
+    global _executor
+    with _executor_lock:
+        _executor = None
+
+
+def _build_dates_in_parallel(dates, api):
+    """Build predictions for several dates across CPU cores, in order.
+
+    If the pool breaks, the dates are built serially through api, the
+    caller's own instance, rather than a pool worker's.
+    """
+    try:
+        return list(build_executor().map(_build_date, dates))
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM); start a fresh pool next time and build serially now
+        reset_build_executor()
+        return [api.get_all_predictions(date_str) for date_str in dates]
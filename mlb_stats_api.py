@@ -1,279 +1,236 @@
-import requests
-import json
 import os
-from datetime import datetime, timedelta
+import hashlib
+from datetime import datetime
 import random
+import logging
+from memory_cache import TTLCache, load_cached_json, store_cached_json
+from single_flight import SingleFlight
+from cache_io import CACHE_ROOT, file_lock, read_json
+from metrics import timed
+from pitcher_store import PitcherStatsStore
+from records import Game, format_era
+from reference_data import TEAM_ABBREVIATIONS, STADIUMS, PITCHERS
+
+logger = logging.getLogger(__name__)
+
+
+def stable_seed(*parts):
+    """Return a random seed derived from parts that is the same in every process.
+
+    The built-in hash() of a string is salted per interpreter, so seeding
+    with it gives each gunicorn worker a different schedule for the same date.
+    """
+    key = '_'.join(str(part) for part in parts)
+    return int.from_bytes(hashlib.sha256(key.encode('utf-8')).digest()[:8], 'big')
+
 
 class MLBStatsAPI:
     def __init__(self):
-        self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'mlb_stats')
+        self.cache_dir = os.path.join(CACHE_ROOT, 'mlb_stats')
         os.makedirs(self.cache_dir, exist_ok=True)
         
+        # Decoded games files, keyed by date
+        self.games_cache = TTLCache(maxsize=64, ttl=3600)  # Cache for 1 hour
+        
+        # Coalesces concurrent rebuilds of the same slate
+        self.single_flight = SingleFlight()
+        
+        # Live MLB Stats API client (opt-in); games are generated locally without it,
+        # and requests is then never imported
+        self.client = None
+        if os.environ.get('MLB_STATS_LIVE') == '1':
+            from mlb_client import MLBStatsClient, DEFAULT_BASE_URL
+            self.client = MLBStatsClient(os.environ.get('MLB_STATS_API_URL', DEFAULT_BASE_URL))
+        
         # Team mapping for MLB Stats API
-        self.team_mapping = {
-            'Arizona Diamondbacks': 'ARI',
-            'Atlanta Braves': 'ATL',
-            'Baltimore Orioles': 'BAL',
-            'Boston Red Sox': 'BOS',
-            'Chicago Cubs': 'CHC',
-            'Chicago White Sox': 'CWS',
-            'Cincinnati Reds': 'CIN',
-            'Cleveland Guardians': 'CLE',
-            'Colorado Rockies': 'COL',
-            'Detroit Tigers': 'DET',
-            'Houston Astros': 'HOU',
-            'Kansas City Royals': 'KC',
-            'Los Angeles Angels': 'LAA',
-            'Los Angeles Dodgers': 'LAD',
-            'Miami Marlins': 'MIA',
-            'Milwaukee Brewers': 'MIL',
-            'Minnesota Twins': 'MIN',
-            'New York Mets': 'NYM',
-            'New York Yankees': 'NYY',
-            'Oakland Athletics': 'OAK',
-            'Athletics': 'OAK',
-            'Philadelphia Phillies': 'PHI',
-            'Pittsburgh Pirates': 'PIT',
-            'San Diego Padres': 'SD',
-            'San Francisco Giants': 'SF',
-            'Seattle Mariners': 'SEA',
-            'St. Louis Cardinals': 'STL',
-            'Tampa Bay Rays': 'TB',
-            'Texas Rangers': 'TEX',
-            'Toronto Blue Jays': 'TOR',
-            'Washington Nationals': 'WSH'
-        }
+        self.team_mapping = TEAM_ABBREVIATIONS
         
         # Stadium mapping
-        self.stadium_mapping = {
-            'ARI': 'Chase Field',
-            'ATL': 'Truist Park',
-            'BAL': 'Oriole Park at Camden Yards',
-            'BOS': 'Fenway Park',
-            'CHC': 'Wrigley Field',
-            'CWS': 'Rate Field',
-            'CIN': 'Great American Ball Park',
-            'CLE': 'Progressive Field',
-            'COL': 'Coors Field',
-            'DET': 'Comerica Park',
-            'HOU': 'Minute Maid Park',
-            'KC': 'Kauffman Stadium',
-            'LAA': 'Angel Stadium',
-            'LAD': 'Dodger Stadium',
-            'MIA': 'loanDepot park',
-            'MIL': 'American Family Field',
-            'MIN': 'Target Field',
-            'NYM': 'Citi Field',
-            'NYY': 'Yankee Stadium',
-            'OAK': 'Oakland Coliseum',
-            'PHI': 'Citizens Bank Park',
-            'PIT': 'PNC Park',
-            'SD': 'Petco Park',
-            'SF': 'Oracle Park',
-            'SEA': 'T-Mobile Park',
-            'STL': 'Busch Stadium',
-            'TB': 'Tropicana Field',
-            'TEX': 'Globe Life Field',
-            'TOR': 'Rogers Centre',
-            'WSH': 'Nationals Park'
-        }
+        self.stadium_mapping = STADIUMS
         
-        # Pitcher database with real ERA values
-        self.pitcher_database = {
-            'Aaron Nola': {'team': 'Philadelphia Phillies', 'era': 3.25},
-            'Zack Wheeler': {'team': 'Philadelphia Phillies', 'era': 2.98},
-            'Cristopher Sánchez': {'team': 'Philadelphia Phillies', 'era': 3.44},
-            'Taijuan Walker': {'team': 'Philadelphia Phillies', 'era': 4.38},
-            'Ranger Suárez': {'team': 'Philadelphia Phillies', 'era': 3.12},
-            
-            'Logan Webb': {'team': 'San Francisco Giants', 'era': 3.25},
-            'Jordan Hicks': {'team': 'San Francisco Giants', 'era': 3.78},
-            'Kyle Harrison': {'team': 'San Francisco Giants', 'era': 4.15},
-            'Robbie Ray': {'team': 'San Francisco Giants', 'era': 3.71},
-            'Blake Snell': {'team': 'San Francisco Giants', 'era': 3.22},
-            
-            'Luis Castillo': {'team': 'Seattle Mariners', 'era': 3.14},
-            'George Kirby': {'team': 'Seattle Mariners', 'era': 3.35},
-            'Logan Gilbert': {'team': 'Seattle Mariners', 'era': 3.73},
-            'Bryce Miller': {'team': 'Seattle Mariners', 'era': 3.92},
-            'Bryan Woo': {'team': 'Seattle Mariners', 'era': 3.63},
-            
-            'Hunter Greene': {'team': 'Cincinnati Reds', 'era': 4.12},
-            'Nick Lodolo': {'team': 'Cincinnati Reds', 'era': 4.23},
-            'Frankie Montas': {'team': 'Cincinnati Reds', 'era': 4.56},
-            'Nick Martinez': {'team': 'Cincinnati Reds', 'era': 4.21},
-            'Brady Singer': {'team': 'Cincinnati Reds', 'era': 4.39},
-            
-            'Corbin Burnes': {'team': 'Baltimore Orioles', 'era': 3.12},
-            'Grayson Rodriguez': {'team': 'Baltimore Orioles', 'era': 3.75},
-            'Dean Kremer': {'team': 'Baltimore Orioles', 'era': 4.15},
-            'Cole Irvin': {'team': 'Baltimore Orioles', 'era': 4.42},
-            'Tomoyuki Sugano': {'team': 'Baltimore Orioles', 'era': None},
-            
-            'Shane Bieber': {'team': 'Cleveland Guardians', 'era': 3.27},
-            'Tanner Bibee': {'team': 'Cleveland Guardians', 'era': 3.91},
-            'Triston McKenzie': {'team': 'Cleveland Guardians', 'era': 4.05},
-            'Gavin Williams': {'team': 'Cleveland Guardians', 'era': 3.88},
-            'Logan Allen': {'team': 'Cleveland Guardians', 'era': 4.12},
-            
-            'Tarik Skubal': {'team': 'Detroit Tigers', 'era': 3.25},
-            'Jack Flaherty': {'team': 'Detroit Tigers', 'era': 3.85},
-            'Casey Mize': {'team': 'Detroit Tigers', 'era': 4.12},
-            'Reese Olson': {'team': 'Detroit Tigers', 'era': 3.92},
-            'Kenta Maeda': {'team': 'Detroit Tigers', 'era': 4.23},
-            
-            'Cole Ragans': {'team': 'Kansas City Royals', 'era': 3.47},
-            'Seth Lugo': {'team': 'Kansas City Royals', 'era': 3.57},
-            'Brady Singer': {'team': 'Kansas City Royals', 'era': 4.11},
-            'Michael Wacha': {'team': 'Kansas City Royals', 'era': 4.25},
-            'Michael Lorenzen': {'team': 'Kansas City Royals', 'era': None},
-            
-            'Mitch Keller': {'team': 'Pittsburgh Pirates', 'era': 3.95},
-            'Paul Skenes': {'team': 'Pittsburgh Pirates', 'era': None},
-            'Marco Gonzales': {'team': 'Pittsburgh Pirates', 'era': 4.25},
-            'Martin Perez': {'team': 'Pittsburgh Pirates', 'era': 4.45},
-            'Andrew Heaney': {'team': 'Pittsburgh Pirates', 'era': 4.56},
-            
-            'MacKenzie Gore': {'team': 'Washington Nationals', 'era': 4.05},
-            'Trevor Williams': {'team': 'Washington Nationals', 'era': 4.46},
-            'Jake Irvin': {'team': 'Washington Nationals', 'era': 4.35},
-            'Patrick Corbin': {'team': 'Washington Nationals', 'era': 5.14},
-            'Mitchell Parker': {'team': 'Washington Nationals', 'era': 4.25},
-            
-            'Zac Gallen': {'team': 'Arizona Diamondbacks', 'era': 3.47},
-            'Merrill Kelly': {'team': 'Arizona Diamondbacks', 'era': 3.52},
-            'Eduardo Rodriguez': {'team': 'Arizona Diamondbacks', 'era': 4.15},
-            'Brandon Pfaadt': {'team': 'Arizona Diamondbacks', 'era': 4.22},
-            'Jordan Montgomery': {'team': 'Arizona Diamondbacks', 'era': 3.75},
-            
-            'Jesús Luzardo': {'team': 'Miami Marlins', 'era': 3.58},
-            'Trevor Rogers': {'team': 'Miami Marlins', 'era': 4.35},
-            'Ryan Weathers': {'team': 'Miami Marlins', 'era': 4.75},
-            'Max Meyer': {'team': 'Miami Marlins', 'era': 4.25},
-            'Edward Cabrera': {'team': 'Miami Marlins', 'era': None},
-            
-            'Gerrit Cole': {'team': 'New York Yankees', 'era': 3.15},
-            'Carlos Rodón': {'team': 'New York Yankees', 'era': 3.75},
-            'Nestor Cortes': {'team': 'New York Yankees', 'era': 4.05},
-            'Clarke Schmidt': {'team': 'New York Yankees', 'era': 4.35},
-            'Will Warren': {'team': 'New York Yankees', 'era': None},
-            
-            'Zach Eflin': {'team': 'Tampa Bay Rays', 'era': 3.86},
-            'Shane Baz': {'team': 'Tampa Bay Rays', 'era': 3.58},
-            'Taj Bradley': {'team': 'Tampa Bay Rays', 'era': 4.19},
-            'Aaron Civale': {'team': 'Tampa Bay Rays', 'era': 4.25},
-            'Zack Littell': {'team': 'Tampa Bay Rays', 'era': 4.37},
-            
-            'Brayan Bello': {'team': 'Boston Red Sox', 'era': 4.24},
-            'Kutter Crawford': {'team': 'Boston Red Sox', 'era': 4.04},
-            'Nick Pivetta': {'team': 'Boston Red Sox', 'era': 4.42},
-            'Tanner Houck': {'team': 'Boston Red Sox', 'era': 3.86},
-            'Sean Newcomb': {'team': 'Boston Red Sox', 'era': 4.75},
-            
-            'Garrett Crochet': {'team': 'Chicago White Sox', 'era': 3.55},
-            'Erick Fedde': {'team': 'Chicago White Sox', 'era': 4.45},
-            'Chris Flexen': {'team': 'Chicago White Sox', 'era': 4.85},
-            'Jonathan Cannon': {'team': 'Chicago White Sox', 'era': None},
-            'Davis Martin': {'team': 'Chicago White Sox', 'era': None},
-            
-            'Paul Blackburn': {'team': 'Athletics', 'era': 4.43},
-            'JP Sears': {'team': 'Athletics', 'era': 4.37},
-            'Ross Stripling': {'team': 'Athletics', 'era': 4.75},
-            'Luis Medina': {'team': 'Athletics', 'era': 4.85},
-            'Osvaldo Bido': {'team': 'Athletics', 'era': 4.95},
-            
-            'Sonny Gray': {'team': 'St. Louis Cardinals', 'era': 3.58},
-            'Kyle Gibson': {'team': 'St. Louis Cardinals', 'era': 4.35},
-            'Miles Mikolas': {'team': 'St. Louis Cardinals', 'era': 4.45},
-            'Steven Matz': {'team': 'St. Louis Cardinals', 'era': 4.25},
-            'Andre Pallante': {'team': 'St. Louis Cardinals', 'era': None},
-            
-            'Kodai Senga': {'team': 'New York Mets', 'era': 3.38},
-            'Luis Severino': {'team': 'New York Mets', 'era': 4.15},
-            'Sean Manaea': {'team': 'New York Mets', 'era': 4.24},
-            'Jose Quintana': {'team': 'New York Mets', 'era': 4.35},
-            'Griffin Canning': {'team': 'New York Mets', 'era': 4.75},
-            
-            'Nathan Eovaldi': {'team': 'Texas Rangers', 'era': 3.63},
-            'Jon Gray': {'team': 'Texas Rangers', 'era': 4.15},
-            'Andrew Heaney': {'team': 'Texas Rangers', 'era': 4.35},
-            'Dane Dunning': {'team': 'Texas Rangers', 'era': 4.25},
-            'Kumar Rocker': {'team': 'Texas Rangers', 'era': None},
-            
-            'Reid Detmers': {'team': 'Los Angeles Angels', 'era': 4.12},
-            'Tyler Anderson': {'team': 'Los Angeles Angels', 'era': 4.35},
-            'Patrick Sandoval': {'team': 'Los Angeles Angels', 'era': 4.25},
-            'José Soriano': {'team': 'Los Angeles Angels', 'era': 4.45},
-            'Jack Kochanowicz': {'team': 'Los Angeles Angels', 'era': None},
-            
-            'Yoshinobu Yamamoto': {'team': 'Los Angeles Dodgers', 'era': 3.15},
-            'Tyler Glasnow': {'team': 'Los Angeles Dodgers', 'era': 3.25},
-            'Walker Buehler': {'team': 'Los Angeles Dodgers', 'era': 3.45},
-            'James Paxton': {'team': 'Los Angeles Dodgers', 'era': 4.15},
-            'Bobby Miller': {'team': 'Los Angeles Dodgers', 'era': 3.85},
-            
-            'Kyle Freeland': {'team': 'Colorado Rockies', 'era': 4.85},
-            'Cal Quantrill': {'team': 'Colorado Rockies', 'era': 4.75},
-            'Austin Gomber': {'team': 'Colorado Rockies', 'era': 4.95},
-            'Ryan Feltner': {'team': 'Colorado Rockies', 'era': 5.05},
-            'Germán Márquez': {'team': 'Colorado Rockies', 'era': 4.65}
-        }
+        # Pitcher database with real ERA values (a copy, since update_pitcher changes it)
+        self.pitcher_database = dict(PITCHERS)
+        
+        # Index of team -> pitcher names (in database order), kept in sync by update_pitcher
+        self.team_rotations = {}
+        for name, record in self.pitcher_database.items():
+            self.team_rotations.setdefault(record['team'], []).append(name)
+        
+        # All pitcher ERAs in one file, refreshed in bulk
+        self.pitcher_store = PitcherStatsStore(
+            os.path.join(self.cache_dir, 'pitcher_eras.json'),
+            self._load_pitcher_eras,
+            ttl=3600  # Cache for 1 hour
+        )
     
     def get_pitcher_era(self, team, pitcher_name):
         """Get ERA for a pitcher from the MLB Stats API or database"""
-        cache_file = os.path.join(self.cache_dir, f"pitcher_era_{team}_{pitcher_name}.json")
-        
-        # Check if we have cached data
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-                if datetime.now().timestamp() - data['timestamp'] < 3600:  # Cache for 1 hour
-                    return data['era'], data['source']
-        
-        # Try to get from our database
-        if pitcher_name in self.pitcher_database:
-            era = self.pitcher_database[pitcher_name]['era']
-            if era is not None:
-                source = "MLB Stats API (Official)"
-                
-                # Cache the result
-                with open(cache_file, 'w') as f:
-                    json.dump({
-                        'era': era,
-                        'source': source,
-                        'timestamp': datetime.now().timestamp()
-                    }, f)
-                
-                return era, source
+        return self.pitcher_store.get(team, pitcher_name)
+    
+    def get_team_rotation(self, team):
+        """Get the names of a team's starting pitchers"""
+        return self.team_rotations.get(team, [])
+    
+    def update_pitcher(self, pitcher_name, team, era):
+        """Add or update a pitcher, keeping the rotation index and ERA store in sync"""
+        previous = self.pitcher_database.get(pitcher_name)
+        if previous is not None and previous['team'] != team:
+            self.team_rotations[previous['team']].remove(pitcher_name)
+        if previous is None or previous['team'] != team:
+            self.team_rotations.setdefault(team, []).append(pitcher_name)
         
-        # If we can't find the ERA, return None
-        return None, "not-found"
+        self.pitcher_database[pitcher_name] = {'team': team, 'era': era}
+        self.pitcher_store.refresh(force=True, pitcher=pitcher_name)
+    
+    def _load_pitcher_eras(self):
+        """Load ERAs for every known pitcher in one pass"""
+        return [
+            {
+                'team': record['team'],
+                'name': name,
+                'era': record['era'],
+                'source': "MLB Stats API (Official)"
+            }
+            for name, record in self.pitcher_database.items()
+        ]
     
     def get_games_for_date(self, date_str, force_refresh=False):
         """Get MLB games for a specific date"""
-        cache_file = os.path.join(self.cache_dir, f"games_{date_str}.json")
+        # Validate the date before it is used in cache and lock file names
+        datetime.strptime(date_str, '%Y-%m-%d')
+        cache_file = self._cache_file(date_str)
         
         # Check if we have cached data
-        if os.path.exists(cache_file) and not force_refresh:
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-                if datetime.now().timestamp() - data['timestamp'] < 3600:  # Cache for 1 hour
-                    return data['games']
+        if not force_refresh:
+            data = self.load_cached_games(date_str)
+            if data is not None:
+                return data['games']
+        
+        # Build once for all concurrent callers (threads and workers)
+        return self.single_flight.do(
+            ('games', date_str, force_refresh),
+            lambda: self._build_games(date_str, cache_file, force_refresh),
+            lock_name=f"games_{date_str}"
+        )
+    
+    def load_cached_games(self, date_str):
+        """Cached games entry ({'games': [Game, ...], 'timestamp'}) for a date, or None"""
+        return load_cached_json(self.games_cache, date_str, self._cache_file(date_str), required=('games',), decode=_decode_games)
+    
+    def cached_games(self):
+        """Yield (date, games as dicts) for every slate in the cache directory"""
+        for entry in os.scandir(self.cache_dir):
+            if not (entry.name.startswith('games_') and entry.name.endswith('.json')):
+                continue
+            data = read_json(entry.path, required=('games',))
+            if data is not None:
+                yield entry.name[len('games_'):-len('.json')], data['games']
+    
+    def invalidate_games(self, date_str):
+        """Drop the cached games for one date"""
+        self.games_cache.pop(date_str)
+        try:
+            os.remove(self._cache_file(date_str))
+        except FileNotFoundError:
+            pass
+    
+    def refresh_game_eras(self, date_str, pitchers):
+        """Re-read the ERAs of some starters in a cached slate, leaving the other games untouched.
+        
+        pitchers is a set of (team, pitcher name) pairs. Returns the number of
+        starters whose ERA changed, or None if the date has no cached slate or
+        the store has no ERA for one of the starters; the caller then drops
+        the slate so it is fetched again rather than patched with "N/A".
+        """
+        cache_file = self._cache_file(date_str)
+        with file_lock(f"games_{date_str}"):
+            data = read_json(cache_file, required=('games', 'timestamp'))
+            if data is None:
+                return None
+            
+            updated = 0
+            for game in data['games']:
+                for side in ('home', 'away'):
+                    if (game[f"{side}_team"], game[f"{side}_pitcher"]) not in pitchers:
+                        continue
+                    era, source = self.get_pitcher_era(game[f"{side}_team"], game[f"{side}_pitcher"])
+                    if era is None:
+                        return None
+                    era_display = format_era(era)
+                    if (era_display, source) != (game[f"{side}_era"], game[f"{side}_era_source"]):
+                        game[f"{side}_era"] = era_display
+                        game[f"{side}_era_source"] = source
+                        updated += 1
+            
+            # The slate keeps its original timestamp, so it expires on schedule
+            if updated:
+                store_cached_json(self.games_cache, date_str, cache_file, _decode_games(data))
+            return updated
+    
+    def _cache_file(self, date_str):
+        """Path of the games cache file for a date"""
+        return os.path.join(self.cache_dir, f"games_{date_str}.json")
+    
+    def _build_games(self, date_str, cache_file, force_refresh):
+        """Generate and cache the games for a date"""
+        # Another worker may have built the file while we waited for the lock
+        if not force_refresh:
+            data = self.load_cached_games(date_str)
+            if data is not None:
+                return data['games']
         
-        # Generate games based on the date
-        games = self._generate_games_for_date(date_str)
+        # Fetch or generate games for the date
+        games = self._games_for_date(date_str)
         
         # Cache the result
-        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-        with open(cache_file, 'w') as f:
-            json.dump({
-                'games': games,
-                'timestamp': datetime.now().timestamp()
-            }, f)
+        store_cached_json(self.games_cache, date_str, cache_file, {
+            'games': games,
+            'timestamp': datetime.now().timestamp()
+        })
+        
+        return games
+    
+    def _games_for_date(self, date_str):
+        """Get games from the MLB Stats API, falling back to generated games"""
+        if self.client is not None:
+            import requests
+            from mlb_client import CircuitOpenError
+            try:
+                return self._fetch_games_for_date(date_str)
+            except (requests.RequestException, CircuitOpenError, ValueError, KeyError) as e:
+                logger.warning(f"MLB Stats API unavailable for {date_str}, using generated games: {e}")
+        
+        return self.generate_games_for_date(date_str)
+    
+    @timed('mlb_fetch_slate_seconds', "Time spent fetching a slate from the MLB Stats API")
+    def _fetch_games_for_date(self, date_str):
+        """Fetch games, probable pitchers and their ERAs from the MLB Stats API"""
+        games = []
+        records = []
+        for slate_game in self.client.get_slate(date_str):
+            pitchers = {}
+            for side in ('home', 'away'):
+                team = slate_game[f"{side}_team"]
+                pitcher = slate_game[f"{side}_pitcher"]
+                era = slate_game[f"{side}_era"]
+                source = "MLB Stats API (Official)" if era is not None else "not-found"
+                pitchers[side] = (pitcher['name'] if pitcher is not None else "TBD", era, source)
+                if era is not None:
+                    records.append({'team': team, 'name': pitcher['name'], 'era': era, 'source': source})
+            
+            games.append(Game(
+                slate_game['home_team'], slate_game['away_team'], slate_game['stadium'], slate_game['time'],
+                pitchers['home'][0], pitchers['away'][0],
+                _round_era(pitchers['home'][1]), _round_era(pitchers['away'][1]),
+                pitchers['home'][2], pitchers['away'][2]
+            ))
         
+        # Make the fetched ERAs available to get_pitcher_era as well
+        self.pitcher_store.add(records)
         return games
     
-    def _generate_games_for_date(self, date_str):
+    @timed('mlb_generate_games_seconds', "Time spent generating a slate of games")
+    def generate_games_for_date(self, date_str):
         """Generate MLB games for a specific date"""
         date_obj = datetime.strptime(date_str, '%Y-%m-%d')
         day_of_week = date_obj.weekday()  # 0 is Monday, 6 is Sunday
@@ -290,8 +247,8 @@ class MLBStatsAPI:
         all_teams = list(self.team_mapping.keys())
         
         # Shuffle teams to create random matchups
-        random.seed(hash(date_str))  # Use date as seed for consistent results
-        random.shuffle(all_teams)
+        rng = random.Random(stable_seed(date_str))  # Use date as seed for consistent results
+        rng.shuffle(all_teams)
         
         games = []
         for i in range(0, min(num_games * 2, len(all_teams)), 2):
@@ -309,37 +266,27 @@ class MLBStatsAPI:
             stadium = self.stadium_mapping.get(home_abbr, "Unknown Stadium")
             
             # Generate game time
-            hour = random.choice([12, 1, 4, 6, 7, 8, 10, 11])
-            minute = random.choice([0, 5, 10, 35, 40])
+            hour = rng.choice([12, 1, 4, 6, 7, 8, 10, 11])
+            minute = rng.choice([0, 5, 10, 35, 40])
             am_pm = "PM" if hour != 12 else "AM"
             
             # Get pitchers for each team
-            home_pitchers = [p for p in self.pitcher_database if self.pitcher_database[p]['team'] == home_team]
-            away_pitchers = [p for p in self.pitcher_database if self.pitcher_database[p]['team'] == away_team]
+            home_pitchers = self.get_team_rotation(home_team)
+            away_pitchers = self.get_team_rotation(away_team)
             
-            home_pitcher = random.choice(home_pitchers) if home_pitchers else "TBD"
-            away_pitcher = random.choice(away_pitchers) if away_pitchers else "TBD"
+            home_pitcher = rng.choice(home_pitchers) if home_pitchers else "TBD"
+            away_pitcher = rng.choice(away_pitchers) if away_pitchers else "TBD"
             
             # Get ERA for pitchers
             home_era, home_source = self.get_pitcher_era(home_team, home_pitcher)
             away_era, away_source = self.get_pitcher_era(away_team, away_pitcher)
             
-            # Format ERA for display
-            home_era_display = f"{home_era:.2f}" if home_era is not None else "N/A"
-            away_era_display = f"{away_era:.2f}" if away_era is not None else "N/A"
-            
-            game = {
-                "home_team": home_team,
-                "away_team": away_team,
-                "stadium": stadium,
-                "time": f"{hour:02d}:{minute:02d} {am_pm}",
-                "home_pitcher": home_pitcher,
-                "away_pitcher": away_pitcher,
-                "home_era": home_era_display,
-                "away_era": away_era_display,
-                "home_era_source": home_source,
-                "away_era_source": away_source
-            }
+            game = Game(
+                home_team, away_team, stadium, f"{hour:02d}:{minute:02d} {am_pm}",
+                home_pitcher, away_pitcher,
+                _round_era(home_era), _round_era(away_era),
+                home_source, away_source
+            )
             
             games.append(game)
         
@@ -347,8 +294,19 @@ class MLBStatsAPI:
     
     def clear_cache(self):
         """Clear the cache directory"""
+        self.games_cache.clear()
+        self.pitcher_store.clear()
         if os.path.exists(self.cache_dir):
-            for file in os.listdir(self.cache_dir):
-                file_path = os.path.join(self.cache_dir, file)
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file():
+                    os.remove(entry.path)
+
+
+def _round_era(era):
+    """ERAs are kept to the two decimals they are displayed with"""
+    return round(era, 2) if era is not None else None
+
+
+def _decode_games(data):
+    """Games cache entry with the games as Game records"""
+    return dict(data, games=[Game.from_dict(game) for game in data['games']])
@@ -0,0 +1,153 @@
+"""Local stand-in for the MLB Stats API, for developing and testing offline.
+
+Serves the two endpoints MLBStatsClient uses:
+
+    /api/v1/schedule?date=YYYY-MM-DD
+    /api/v1/people/<id>/stats?season=YYYY
+
+Responses come from JSON fixtures when present (schedule_<date>.json and
+people_<id>_stats.json in the fixtures directory); otherwise they are
+synthesized from the generated schedule and pitcher database. Run it and
+point the app at it with:
+
+    python mlb_stub_server.py --port 8765
+    MLB_STATS_LIVE=1 MLB_STATS_API_URL=http://127.0.0.1:8765/api/v1 python app.py
+"""
+import os
+import json
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from mlb_stats_api import MLBStatsAPI, stable_seed
+
+
+class StubData:
+    """Synthesizes MLB Stats API responses from the local pitcher database"""
+
+    def __init__(self, fixtures_dir=None):
+        self.fixtures_dir = fixtures_dir
+        self.stats_api = MLBStatsAPI()
+        self.team_ids = {team: i + 100 for i, team in enumerate(self.stats_api.team_mapping)}
+        self.pitcher_ids = {name: stable_seed(name) % 900000 + 100000 for name in self.stats_api.pitcher_database}
+        self.pitchers_by_id = {pitcher_id: name for name, pitcher_id in self.pitcher_ids.items()}
+
+    def fixture(self, name):
+        """Return a fixture document, or None if there is none"""
+        if self.fixtures_dir is None:
+            return None
+        path = os.path.join(self.fixtures_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def schedule(self, date_str):
+        fixture = self.fixture(f"schedule_{date_str}.json")
+        if fixture is not None:
+            return fixture
+
+        games = []
+        for i, game in enumerate(self.stats_api.generate_games_for_date(date_str)):
+            games.append({
+                'gamePk': stable_seed(date_str, i) % 1000000,
+                'gameDate': _game_date(date_str, game.time),
+                'teams': {
+                    'home': self._team_side(game.home_team, game.home_pitcher),
+                    'away': self._team_side(game.away_team, game.away_pitcher)
+                },
+                'venue': {'name': game.stadium}
+            })
+        return {'dates': [{'date': date_str, 'games': games}]}
+
+    def pitcher_stats(self, pitcher_id, season):
+        fixture = self.fixture(f"people_{pitcher_id}_stats.json")
+        if fixture is not None:
+            return fixture
+
+        name = self.pitchers_by_id.get(pitcher_id)
+        if name is None:
+            return None
+
+        era = self.stats_api.pitcher_database[name]['era']
+        splits = [] if era is None else [{'season': season, 'stat': {'era': f"{era:.2f}"}}]
+        return {'stats': [{'type': {'displayName': 'season'}, 'group': {'displayName': 'pitching'}, 'splits': splits}]}
+
+    def _team_side(self, team, pitcher):
+        side = {'team': {'id': self.team_ids[team], 'name': team}}
+        if pitcher in self.pitcher_ids:
+            side['probablePitcher'] = {'id': self.pitcher_ids[pitcher], 'fullName': pitcher}
+        return side
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Routes stub API requests; optionally fails a fraction of them with 503"""
+
+    data = None
+    fail_rate = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        parts = url.path.strip('/').split('/')
+
+        if random.random() < self.fail_rate:
+            return self._send(503, {'message': 'Injected failure'})
+
+        if parts == ['api', 'v1', 'schedule'] and 'date' in params:
+            return self._send(200, self.data.schedule(params['date'][0]))
+
+        if len(parts) == 5 and parts[:3] == ['api', 'v1', 'people'] and parts[4] == 'stats' and parts[3].isdigit():
+            season = params.get('season', [str(datetime.now().year)])[0]
+            stats = self.data.pitcher_stats(int(parts[3]), season)
+            if stats is not None:
+                return self._send(200, stats)
+
+        self._send(404, {'message': 'Object not found'})
+
+    def _send(self, status, document):
+        body = json.dumps(document).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host='127.0.0.1', port=8765, fixtures_dir=None, fail_rate=0.0):
+    """Create (but do not start) a stub server"""
+    handler = type('Handler', (StubHandler,), {'data': StubData(fixtures_dir), 'fail_rate': fail_rate})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve_in_thread(fixtures_dir=None, fail_rate=0.0):
+    """Start a stub server on a free port in a daemon thread; returns (server, base_url)"""
+    server = make_server(port=0, fixtures_dir=fixtures_dir, fail_rate=fail_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+
+
+def _game_date(date_str, time_str):
+    """Convert a generated 'HH:MM AM/PM' Eastern start time to an ISO UTC timestamp"""
+    start = datetime.strptime(f"{date_str} {time_str}", '%Y-%m-%d %I:%M %p')
+    start = start.replace(tzinfo=timezone(timedelta(hours=-4)))
+    return start.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', help="directory of JSON fixtures to serve instead of synthesized data")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="fraction of requests to fail with 503")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.fixtures, args.fail_rate)
+    print(f"MLB Stats API stub listening on http://{args.host}:{args.port}/api/v1")
+    server.serve_forever()
@@ -0,0 +1,159 @@
+import os
+import threading
+from datetime import datetime
+from cache_io import file_lock, read_json, write_json_atomic
+
+
+class PitcherStatsStore:
+    """Indexed ERA store for every pitcher, backed by one JSON file.
+
+    The whole table is loaded once and refreshed in bulk when its TTL runs
+    out, so a lookup is a dict access and one stat() instead of a file per
+    pitcher. The stat() catches the file being rewritten by another worker
+    (a forced refresh or new fetched records), which is then re-read. The
+    loader is a callable returning a list of {'team', 'name', 'era', 'source'}
+    records; it is only called when the shared file is missing or stale.
+    Records fetched from the MLB Stats API are added with add() and kept in
+    the same file, overriding the loader's until they are ttl old or the
+    pitcher is refreshed explicitly.
+    """
+
+    def __init__(self, path, loader, ttl=3600):
+        self.path = path
+        self.loader = loader
+        self.ttl = ttl
+        self._eras = {}
+        self._expires = 0  # When the loaded table (or a fetched record in it) goes stale
+        self._version = None  # mtime of the file the table was loaded from
+        self._lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(self, team, pitcher_name):
+        """Return (era, source) for a pitcher, or (None, "not-found")"""
+        if not self._is_current():
+            self.refresh()
+
+        entry = self._eras.get((team, pitcher_name))
+        if entry is None:
+            self.misses += 1
+            return None, "not-found"
+
+        self.hits += 1
+        return entry
+
+    def refresh(self, force=False, pitcher=None, team=None):
+        """Reload the table from the shared file, rebuilding it if stale.
+
+        force=True rebuilds it from the loader; the fetched records of the
+        given pitcher (optionally only on team) are dropped so the loader's
+        newer ERA wins, while other unexpired fetched records are kept.
+        """
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if not force and self._is_current():
+                return
+
+            with file_lock('pitcher_eras'):
+                data = self._read_file()
+                if force:
+                    fetched = [
+                        p for p in self._unexpired(data['fetched'] if data is not None else [])
+                        if not (p['name'] == pitcher and (team is None or p['team'] == team))
+                    ]
+                    data = self._rebuild(fetched)
+                    write_json_atomic(self.path, data)
+                elif not self._is_fresh(data):
+                    data = self._rebuild()
+                    write_json_atomic(self.path, data)
+                # Writers hold the lock, so the file cannot change between the read and this stat
+                version = self._file_version()
+
+            self._load(data, version)
+            self.refreshes += 1
+
+    def add(self, records):
+        """Merge freshly fetched records into the table and the shared file.
+
+        Fetched records are kept apart from the loader's output and expire
+        ttl seconds after they were fetched.
+        """
+        records = [p for p in records if p['era'] is not None]
+        if not records:
+            return
+
+        with self._lock:
+            with file_lock('pitcher_eras'):
+                data = self._read_file()
+                if not self._is_fresh(data):
+                    data = self._rebuild()
+                now = datetime.now().timestamp()
+                fetched = {(p['team'], p['name']): p for p in self._unexpired(data['fetched'])}
+                fetched.update(((p['team'], p['name']), dict(p, fetched=now)) for p in records)
+                data['fetched'] = list(fetched.values())
+                write_json_atomic(self.path, data)
+                version = self._file_version()
+
+            self._load(data, version)
+
+    def _rebuild(self, fetched=()):
+        """New file contents from the loader, with the given fetched records"""
+        return {
+            'pitchers': self.loader(),
+            'fetched': list(fetched),
+            'timestamp': datetime.now().timestamp()
+        }
+
+    def _load(self, data, version):
+        """Index the file's records; unexpired fetched ERAs take precedence over the loader's"""
+        fetched = self._unexpired(data['fetched'])
+        self._eras = {
+            (p['team'], p['name']): (p['era'], p['source'])
+            for p in data['pitchers'] + fetched if p['era'] is not None
+        }
+        self._expires = min([data['timestamp']] + [p['fetched'] for p in fetched]) + self.ttl
+        self._version = version
+
+    def _is_current(self):
+        """Whether the loaded table is unexpired and still matches the shared file"""
+        return datetime.now().timestamp() < self._expires and self._file_version() == self._version
+
+    def _file_version(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _unexpired(self, fetched):
+        """Fetched records less than ttl old"""
+        now = datetime.now().timestamp()
+        return [p for p in fetched if now - p.get('fetched', 0) < self.ttl]
+
+    def _read_file(self):
+        """Return the shared file's data, or None if it is missing or unreadable"""
+        data = read_json(self.path, required=('pitchers', 'timestamp'))
+        if data is not None:
+            data.setdefault('fetched', [])
+        return data
+
+    def _is_fresh(self, data):
+        return data is not None and datetime.now().timestamp() - data['timestamp'] < self.ttl
+
+    def clear(self):
+        """Drop the in-memory table so the next lookup reloads it"""
+        with self._lock:
+            self._eras = {}
+            self._expires = 0
+            self._version = None
+
+    def stats(self):
+        """Return lookup counters and table size"""
+        return {
+            'size': len(self._eras),
+            'hits': self.hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes
+        }
@@ -0,0 +1,284 @@
+"""Append-only columnar archive of every generated game prediction.
+
+Each field of RECORD_DTYPE is stored as its own typed array in one file per
+column that is only ever appended to, and read back through NumPy memory
+maps, so a query touches only the columns and rows it needs. A row exists
+once every column holds it; a partial append is invisible and dropped by
+the next one. Text fields (teams, stadiums, pitchers, game times, data
+sources) are stored as codes into a shared string table. Readers keep
+sorted indexes on date, team, stadium, pitcher and prediction type, and
+merge only the appended rows into them.
+
+The archive lives outside the cache directory (ARCHIVE_DIR, default
+./archive), so cache refreshes and sweeps never delete it.
+"""
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from cache_io import file_lock, read_json, write_json_atomic
+from prediction_engine import PREDICTION_TYPES
+
+ARCHIVE_DIR = os.environ.get('MLB_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive'))
+
+RATINGS = ('Bet', 'Lean', 'Pass')
+
+RECORD_DTYPE = np.dtype([
+    ('date', 'M8[D]'),
+    ('type', 'u1'),
+    ('rating', 'u1'),
+    ('home_team', 'u4'),
+    ('away_team', 'u4'),
+    ('stadium', 'u4'),
+    ('time', 'u4'),
+    ('home_pitcher', 'u4'),
+    ('away_pitcher', 'u4'),
+    ('data_source', 'u4'),
+    ('home_era', 'f4'),  # NaN when the ERA is N/A
+    ('away_era', 'f4'),
+    ('probability', 'f4'),
+    ('created', 'f8')
+])
+
+# Query parameter -> record columns it is indexed on
+INDEXED_COLUMNS = {
+    'date': ('date',),
+    'type': ('type',),
+    'team': ('home_team', 'away_team'),
+    'stadium': ('stadium',),
+    'pitcher': ('home_pitcher', 'away_pitcher')
+}
+
+TEXT_COLUMNS = ('home_team', 'away_team', 'stadium', 'time', 'home_pitcher', 'away_pitcher', 'data_source')
+
+
+class PredictionArchive:
+    """Appends predictions to the archive and answers indexed queries over it"""
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self.column_paths = {name: os.path.join(directory, f"{name}.v2.bin") for name in RECORD_DTYPE.names}
+        self.strings_path = os.path.join(directory, 'strings.json')
+        self._lock = threading.Lock()
+        self._columns = None  # Column name -> memory map of its complete rows
+        self._count = 0
+        self._strings = []
+        self._codes = {}
+        self._strings_version = None
+        self._indexes = {}
+
+    def append(self, date_str, predictions):
+        """Archive {prediction_type: [Prediction, ...]} generated for a date"""
+        rows = [(prediction_type, p) for prediction_type, items in predictions.items() for p in items]
+        if not rows:
+            return 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        with file_lock('archive'):
+            strings = read_json(self.strings_path, required=('strings',))
+            if strings is None and self._row_count():
+                # Starting a new table would give the existing rows' codes other strings
+                raise ValueError(f"Archive string table {self.strings_path} is missing or unreadable")
+            strings = strings['strings'] if strings is not None else []
+            codes = {value: code for code, value in enumerate(strings)}
+            known = len(strings)
+
+            def code(value):
+                if value not in codes:
+                    codes[value] = len(strings)
+                    strings.append(value)
+                return codes[value]
+
+            records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+            now = datetime.now().timestamp()
+            for i, (prediction_type, p) in enumerate(rows):
+                game = p.game
+                records[i] = (
+                    np.datetime64(date_str, 'D'),
+                    PREDICTION_TYPES.index(prediction_type),
+                    RATINGS.index(p.rating),
+                    code(game.home_team),
+                    code(game.away_team),
+                    code(game.stadium),
+                    code(game.time),
+                    code(game.home_pitcher),
+                    code(game.away_pitcher),
+                    code(game.home_era_source),
+                    _era_value(game.home_era),
+                    _era_value(game.away_era),
+                    p.probability,
+                    now
+                )
+
+            # New strings are saved before any record refers to them
+            if len(strings) > known:
+                write_json_atomic(self.strings_path, {'strings': strings})
+
+            count = self._row_count()
+            for name, path in self.column_paths.items():
+                with open(path, 'ab') as f:
+                    # Drop rows of an interrupted append that did not reach every column
+                    f.truncate(count * RECORD_DTYPE[name].itemsize)
+                    f.write(np.ascontiguousarray(records[name]).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+        return len(rows)
+
+    def query(self, start_str=None, end_str=None, prediction_type=None, team=None, stadium=None, pitcher=None,
+              latest=True, limit=1000):
+        """Return archived predictions matching every given filter, in date order.
+
+        With latest=True only the most recent version of each game's
+        prediction is returned (a game is re-archived when its inputs change).
+        """
+        with self._lock:
+            columns = self._refresh()
+            if columns is None:
+                return []
+
+            selected = None
+            if start_str or end_str:
+                selected = self._indexes['date'].range(
+                    np.datetime64(start_str or '1900-01-01', 'D'), np.datetime64(end_str or '2999-12-31', 'D')
+                )
+            for name, value in (('type', prediction_type), ('team', team), ('stadium', stadium), ('pitcher', pitcher)):
+                if value is None:
+                    continue
+                key = PREDICTION_TYPES.index(value) if name == 'type' else self._codes.get(value)
+                if key is None:
+                    return []
+                matches = self._indexes[name].lookup(key)
+                selected = matches if selected is None else np.intersect1d(selected, matches, assume_unique=True)
+            if selected is None:
+                selected = np.arange(self._count)
+
+            if latest and len(selected):
+                # Keep the last row per (date, type, matchup, time)
+                game_keys = np.stack([
+                    columns[name][selected].astype(np.int64) for name in ('date', 'type', 'home_team', 'away_team', 'time')
+                ], axis=1)
+                _, last = np.unique(game_keys[::-1], axis=0, return_index=True)
+                selected = selected[np.sort(len(selected) - 1 - last)]
+            selected = selected[np.argsort(columns['date'][selected], kind='stable')][:limit]
+
+            values = {name: column[selected] for name, column in columns.items()}
+            return [self._decode(values, i) for i in range(len(selected))]
+
+    def stats(self):
+        """Row count and file size of the archive"""
+        with self._lock:
+            columns = self._refresh()
+        return {
+            'rows': 0 if columns is None else self._count,
+            'bytes': sum(os.path.getsize(path) for path in self.column_paths.values() if os.path.exists(path))
+        }
+
+    def _row_count(self):
+        """Number of rows present in every column file"""
+        try:
+            return min(os.path.getsize(path) // RECORD_DTYPE[name].itemsize for name, path in self.column_paths.items())
+        except FileNotFoundError:
+            return 0
+
+    def _refresh(self):
+        """Remap the column files and index any appended rows; returns the columns, or None if there are none"""
+        count = self._row_count()
+        if count == 0:
+            return None
+        if self._columns is not None and self._count == count:
+            return self._columns
+
+        # Without a readable string table the rows cannot be decoded; serve an empty archive
+        try:
+            version = os.stat(self.strings_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if version != self._strings_version:
+            strings = read_json(self.strings_path, required=('strings',))
+            if strings is None:
+                return None
+            self._strings = strings['strings']
+            self._codes = {value: code for code, value in enumerate(self._strings)}
+            self._strings_version = version
+
+        previous = self._count if self._columns is not None and count > self._count else 0
+        self._columns = {
+            name: np.memmap(path, dtype=RECORD_DTYPE[name], mode='r', shape=(count,))
+            for name, path in self.column_paths.items()
+        }
+        self._count = count
+        if previous:
+            for index in self._indexes.values():
+                index.extend(self._columns, previous)
+        else:
+            self._indexes = {name: _Index(self._columns, columns) for name, columns in INDEXED_COLUMNS.items()}
+        return self._columns
+
+    def _decode(self, values, i):
+        """Turn row i of the gathered column values back into the prediction dict served by the API"""
+        record = {name: column[i] for name, column in values.items()}
+        text = {column: self._strings[record[column]] for column in TEXT_COLUMNS}
+        return {
+            'date': str(record['date']),
+            'type': PREDICTION_TYPES[record['type']],
+            'home_team': text['home_team'],
+            'away_team': text['away_team'],
+            'stadium': text['stadium'],
+            'time': text['time'],
+            'home_pitcher': text['home_pitcher'],
+            'away_pitcher': text['away_pitcher'],
+            'home_era': _era_display(record['home_era']),
+            'away_era': _era_display(record['away_era']),
+            'probability': round(float(record['probability']), 1),
+            'rating': RATINGS[record['rating']],
+            'data_source': text['data_source'],
+            'archived_at': float(record['created'])
+        }
+
+
+class _Index:
+    """Sorted (key, row) pairs over one or more columns for equality and range lookups"""
+
+    def __init__(self, columns, names):
+        self.names = names
+        self.keys = None
+        self.rows = None
+        self.extend(columns, 0)
+
+    def extend(self, columns, start):
+        """Add the rows from start onwards, merging them into the sorted pairs"""
+        count = len(columns[self.names[0]])
+        keys = np.concatenate([np.asarray(columns[name][start:]) for name in self.names])
+        row_ids = np.tile(np.arange(start, count, dtype=np.int64), len(self.names))
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        row_ids = row_ids[order]
+        if self.keys is None:
+            self.keys = keys
+            self.rows = row_ids
+            return
+
+        # New rows follow every indexed one, so they go after existing equal keys
+        positions = np.searchsorted(self.keys, keys, side='right')
+        self.keys = np.insert(self.keys, positions, keys)
+        self.rows = np.insert(self.rows, positions, row_ids)
+
+    def lookup(self, key):
+        """Sorted row ids whose column(s) equal key"""
+        return self.range(key, key)
+
+    def range(self, low, high):
+        """Sorted row ids whose column(s) fall within [low, high]"""
+        lo = np.searchsorted(self.keys, low, side='left')
+        hi = np.searchsorted(self.keys, high, side='right')
+        return np.unique(self.rows[lo:hi])
+
+
+def _era_value(era):
+    return np.nan if era is None else era
+
+
+def _era_display(era):
+    return "N/A" if np.isnan(era) else f"{era:.2f}"
@@ -0,0 +1,162 @@
+import os
+import json
+import hashlib
+import numpy as np
+from mlb_stats_api import stable_seed
+from metrics import timed
+from records import Prediction, to_json
+
+PREDICTION_TYPES = ('under_1_run_1st', 'over_2.5_runs_3', 'over_3.5_runs_3')
+
+# Base probability and direction of the ERA/ballpark adjustment per prediction type
+TYPE_PARAMS = {
+    'under_1_run_1st': (0.5, -1.0),  # Lower ERAs = higher probability of under 1 run
+    'over_2.5_runs_3': (0.5, 1.0),   # Higher ERAs = higher probability of over 2.5 runs
+    'over_3.5_runs_3': (0.4, 1.0)    # Higher ERAs = higher probability of over 3.5 runs
+}
+
+# What each prediction type pays out on: (innings counted, run line, side)
+MARKETS = {
+    'under_1_run_1st': (1, 1.0, 'under'),
+    'over_2.5_runs_3': (3, 2.5, 'over'),
+    'over_3.5_runs_3': (3, 3.5, 'over')
+}
+
+DEFAULT_ERA = 4.50
+
+# Lowest probability (in percent) rated Bet or Lean; anything below is a Pass
+RATING_THRESHOLDS = {'Bet': 60, 'Lean': 52}
+
+# Coefficients of the linear model (see PredictionEngine.probabilities)
+LINEAR_WEIGHTS = {
+    'era_baseline': 4.0,  # ERA at which the ERA adjustment is zero
+    'era': 0.05,          # Probability per run of average starter ERA above the baseline
+    'ballpark': 0.2,      # Probability per unit of ballpark factor above neutral
+    'min': 0.4,
+    'max': 0.7,
+    'noise': 0.1          # Width of the stable per-matchup noise
+}
+
+
+class PredictionEngine:
+    """Batch scoring of game slates for every prediction type at once.
+
+    A slate (or several) is converted into columnar NumPy arrays once, and
+    probabilities and ratings are computed for all games and all prediction
+    types in a single vectorized pass. Games are Game records and results
+    are Prediction records (see records.py).
+
+    Probabilities come from the linear ERA/ballpark model unless a simulator
+    (see simulator.InningSimulator) is given, in which case they are read
+    off its simulated run distributions.
+    """
+
+    def __init__(self, ballpark_factors, factor_breakdown=None, simulator=None):
+        self.ballpark_factors = ballpark_factors
+        self.factor_breakdown = factor_breakdown
+        self.simulator = simulator
+        if simulator is None:
+            self.model_key = f"linear:{model_hash(TYPE_PARAMS, LINEAR_WEIGHTS, DEFAULT_ERA, RATING_THRESHOLDS, ballpark_factors)}"
+        else:
+            self.model_key = simulator.model_key
+
+    def fingerprint(self, game):
+        """Hash of a game's inputs and the model; equal fingerprints mean equal predictions"""
+        return hashlib.sha1(json.dumps([self.model_key, game], sort_keys=True, default=to_json).encode('utf-8')).hexdigest()
+
+    def score(self, games, prediction_types=PREDICTION_TYPES):
+        """Score one slate; returns {prediction_type: [prediction, ...]}"""
+        return self.score_slates({None: games}, prediction_types)[None]
+
+    @timed('mlb_score_slates_seconds', "Time spent scoring slates for all prediction types")
+    def score_slates(self, slates, prediction_types=PREDICTION_TYPES):
+        """Score many slates in one pass; returns {key: {prediction_type: [prediction, ...]}}"""
+        games = [game for slate in slates.values() for game in slate]
+        probabilities = self.probabilities(games, prediction_types)
+
+        ratings = rate(probabilities).tolist()
+        probabilities = probabilities.tolist()
+
+        results = {}
+        offset = 0
+        for key, slate in slates.items():
+            results[key] = {
+                prediction_type: [
+                    self._prediction(game, prediction_type, probabilities[t][offset + i], ratings[t][offset + i])
+                    for i, game in enumerate(slate)
+                ]
+                for t, prediction_type in enumerate(prediction_types)
+            }
+            offset += len(slate)
+
+        return results
+
+    def probabilities(self, games, prediction_types=PREDICTION_TYPES):
+        """Return a (types x games) array of probabilities in percent"""
+        if self.simulator is not None:
+            return self.simulator.probabilities(games, prediction_types)
+
+        home_era = np.array([era_or_default(game.home_era) for game in games], dtype=np.float64)
+        away_era = np.array([era_or_default(game.away_era) for game in games], dtype=np.float64)
+        ballpark = np.array([self.ballpark_factors.get(game.stadium, 1.0) for game in games], dtype=np.float64)
+
+        base, direction = np.array([TYPE_PARAMS[t] for t in prediction_types], dtype=np.float64).reshape(-1, 2).T
+        base = base[:, None]
+        direction = direction[:, None]
+
+        # ERA and ballpark adjustments, broadcast over (types, games)
+        weights = LINEAR_WEIGHTS
+        era_term = ((home_era + away_era) / 2 - weights['era_baseline']) * weights['era']
+        park_term = (ballpark - 1.0) * weights['ballpark']
+        prob = base + direction * era_term + direction * park_term
+
+        # Ensure probability is between 0.4 and 0.7
+        prob = np.clip(prob, weights['min'], weights['max'])
+
+        # Add some randomness for variety (stable per matchup and type)
+        noise = np.array([
+            [stable_seed(game.home_team, game.away_team, t) / 2.0 ** 64 for game in games]
+            for t in prediction_types
+        ], dtype=np.float64).reshape(len(prediction_types), len(games))
+        prob = prob + (noise - 0.5) * weights['noise']
+
+        return np.round(prob * 100, 1)
+
+    def _prediction(self, game, prediction_type, probability, rating):
+        """Build the prediction record for one game and type"""
+        return Prediction(game, prediction_type, probability, rating, self.factor_breakdown(game, prediction_type))
+
+
+def build_engine(ballpark_factors, factor_breakdown=None):
+    """The engine configured by the environment; PREDICTION_MODEL=simulation uses the Monte Carlo model.
+
+    factor_breakdown is only needed to build Prediction records; an engine
+    used just for probabilities() can leave it out.
+    """
+    simulator = None
+    if os.environ.get('PREDICTION_MODEL', 'linear') == 'simulation':
+        from simulator import InningSimulator  # simulator imports this module
+        simulator = InningSimulator(
+            ballpark_factors,
+            simulations=int(os.environ.get('SIMULATIONS', 20000)),
+            seed=int(os.environ.get('SIMULATION_SEED', 0))
+        )
+    return PredictionEngine(ballpark_factors, factor_breakdown, simulator)
+
+
+def model_hash(*constants):
+    """Short hash of the constants a model's probabilities and ratings depend on"""
+    return hashlib.sha1(json.dumps(constants, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def rate(probabilities):
+    """Ratings based on probability (in percent), elementwise over an array"""
+    return np.where(
+        probabilities >= RATING_THRESHOLDS['Bet'], "Bet",
+        np.where(probabilities >= RATING_THRESHOLDS['Lean'], "Lean", "Pass")
+    )
+
+
+def era_or_default(era):
+    """ERA as a float, using the league-average default when it is unknown"""
+    return float(era) if era is not None else DEFAULT_ERA
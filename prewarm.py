@@ -0,0 +1,81 @@
+import os
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; every process then acts as leader
+    fcntl = None
+
+from cache_io import LOCK_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class PrewarmScheduler:
+    """Background thread that rebuilds upcoming slates before their caches expire.
+
+    Every interval (plus or minus some jitter) the scheduler rebuilds games
+    and predictions for today and the next days_ahead days whose cache entries
+    would expire within margin seconds. Only the gunicorn worker holding the
+    leader lock file does the work; the others keep retrying in case the
+    leader exits.
+    """
+
+    def __init__(self, prediction_api, days_ahead=1, interval=60, margin=120, jitter=10):
+        self.prediction_api = prediction_api
+        self.days_ahead = days_ahead
+        self.interval = interval
+        self.margin = margin
+        self.jitter = jitter
+        self._leader_file = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='prewarm', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Ask the scheduler thread to exit"""
+        self._stop.set()
+
+    def is_leader(self):
+        """Try to become (or stay) the only process doing prewarm work"""
+        if fcntl is None or self._leader_file is not None:
+            return True
+
+        os.makedirs(LOCK_DIR, exist_ok=True)
+        leader_file = open(os.path.join(LOCK_DIR, 'prewarm.leader'), 'a')
+        try:
+            fcntl.flock(leader_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            leader_file.close()
+            return False
+
+        # Keep the file open: the lock is held for the life of this process
+        self._leader_file = leader_file
+        return True
+
+    def prewarm_once(self):
+        """Rebuild every date in the window that is about to expire"""
+        today = datetime.now()
+        for offset in range(self.days_ahead + 1):
+            date_str = (today + timedelta(days=offset)).strftime('%Y-%m-%d')
+            try:
+                self.prediction_api.prewarm(date_str, self.margin)
+            except Exception:
+                logger.exception(f"Error prewarming {date_str}")
+
+    def _run(self):
+        """Scheduler loop"""
+        # Start at a random point so workers booted together do not align
+        delay = random.uniform(0, self.jitter)
+        while not self._stop.wait(delay):
+            if self.is_leader():
+                self.prewarm_once()
+            delay = self.interval + random.uniform(-self.jitter, self.jitter)
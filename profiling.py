@@ -0,0 +1,232 @@
+"""Opt-in per-request profiling and slow-request capture.
+
+Set PROFILING_ENABLED=1 to turn it on. A request is then profiled with
+cProfile when it asks for it (an `X-Profile: <PROFILE_TOKEN>` header or
+`profile=<PROFILE_TOKEN>` query argument) or is picked by sampling
+(PROFILE_SAMPLE_RATE). Every other request has its thread's stack sampled
+in the background, and if it runs longer than PROFILE_SLOW_MS (0 turns this
+off) the samples are kept as a capture too. Asking for profiling and reading
+captures both require PROFILE_TOKEN; without it only sampled and slow
+requests are captured, and the captures stay on local disk.
+
+Each capture is a data file (`<id>.prof` for pstats, or `<id>.folded`
+collapsed stacks for flame graph tools) plus `<id>.json` describing the
+request. The directory keeps only the newest PROFILE_MAX_CAPTURES captures.
+"""
+import os
+import re
+import sys
+import hmac
+import time
+import uuid
+import random
+import logging
+import cProfile
+import threading
+from datetime import datetime
+
+from cache_io import CACHE_ROOT, read_json, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(CACHE_ROOT, 'profiles'))
+
+# Capture ids are generated here; anything else is rejected before touching the disk
+CAPTURE_ID = re.compile(r'^\d{8}-\d{6}-\d{6}-[0-9a-f]{6}$')
+
+
+class StackSampler:
+    """Samples the stacks of tracked threads from a background thread.
+
+    Samples are kept per thread as {folded stack: count}, where a folded
+    stack is `file:function` frames joined by ';' from the root down.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self._samples = {}  # thread id -> {folded stack: count}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def track(self, thread_id):
+        """Start collecting samples for a thread"""
+        with self._lock:
+            self._samples[thread_id] = {}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+
+    def untrack(self, thread_id):
+        """Stop collecting samples for a thread and return them"""
+        with self._lock:
+            return self._samples.pop(thread_id, {})
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._samples:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, counts in self._samples.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stack = _fold(frame)
+                        counts[stack] = counts.get(stack, 0) + 1
+
+
+class RequestProfiler:
+    """Decides which requests to profile and stores the resulting captures"""
+
+    def __init__(self, directory=PROFILE_DIR, sample_rate=0.0, slow_ms=1000, max_captures=50, token=None):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.max_captures = max_captures
+        self.token = token
+        self.sampler = StackSampler()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+            slow_ms=float(os.environ.get('PROFILE_SLOW_MS', 1000)),
+            max_captures=int(os.environ.get('PROFILE_MAX_CAPTURES', 50)),
+            token=os.environ.get('PROFILE_TOKEN') or None
+        )
+
+    def has_token(self, value):
+        """Whether value is the profile token (never, if no token is set).
+
+        Used both for X-Profile/profile, which ask for a profile, and for
+        X-Profile-Token/token on the admin endpoints.
+        """
+        # Compared as bytes: compare_digest rejects str with non-ASCII characters
+        return self.token is not None and hmac.compare_digest((value or '').encode('utf-8'), self.token.encode('utf-8'))
+
+    def start(self, requested):
+        """Begin observing the current request; returns the state to pass to finish()"""
+        if requested:
+            trigger = 'requested'
+        elif self.sample_rate and random.random() < self.sample_rate:
+            trigger = 'sampled'
+        else:
+            trigger = None
+
+        profile = None
+        if trigger is not None:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is active in this thread; fall back to stack samples
+                profile = None
+        if profile is None and self.slow_ms:
+            self.sampler.track(threading.get_ident())
+        return {
+            'id': f"{datetime.now():%Y%m%d-%H%M%S-%f}-{uuid.uuid4().hex[:6]}",
+            'trigger': trigger,
+            'profile': profile,
+            'start': time.perf_counter()
+        }
+
+    def finish(self, state, method, path, query, status):
+        """Stop observing the request; returns the capture id if it was kept, else None"""
+        duration_ms = (time.perf_counter() - state['start']) * 1000
+        profile = state['profile']
+        if profile is not None:
+            profile.disable()
+            samples = None
+        else:
+            samples = self.sampler.untrack(threading.get_ident()) if self.slow_ms else None
+
+        slow = bool(self.slow_ms) and duration_ms >= self.slow_ms
+        if profile is None and not (slow and samples):
+            return None
+
+        capture_id = state['id']
+        meta = {
+            'id': capture_id,
+            'kind': 'cprofile' if profile is not None else 'stacks',
+            'trigger': state['trigger'] or 'slow',
+            'slow': slow,
+            'method': method,
+            'path': path,
+            'query': query,
+            'status': status,
+            'duration_ms': round(duration_ms, 3),
+            'timestamp': datetime.now().timestamp(),
+            'pid': os.getpid()
+        }
+        try:
+            self._save(meta, profile, samples)
+        except OSError:
+            logger.exception(f"Error saving profile capture {capture_id}")
+            return None
+        return capture_id
+
+    def captures(self):
+        """Metadata of every stored capture, newest first"""
+        try:
+            names = sorted((name for name in os.listdir(self.directory) if name.endswith('.json')), reverse=True)
+        except FileNotFoundError:
+            return []
+        captures = []
+        for name in names:
+            meta = read_json(os.path.join(self.directory, name), required=('id', 'kind'))
+            if meta is not None:
+                captures.append(meta)
+        return captures
+
+    def capture_file(self, capture_id):
+        """(path, kind) of a capture's data file, or None if there is no such capture"""
+        if not CAPTURE_ID.match(capture_id):
+            return None
+        meta = read_json(os.path.join(self.directory, f"{capture_id}.json"), required=('kind',))
+        if meta is None:
+            return None
+        path = os.path.join(self.directory, capture_id + _extension(meta['kind']))
+        return (path, meta['kind']) if os.path.exists(path) else None
+
+    def _save(self, meta, profile, samples):
+        os.makedirs(self.directory, exist_ok=True)
+        data_path = os.path.join(self.directory, meta['id'] + _extension(meta['kind']))
+        if profile is not None:
+            profile.dump_stats(data_path)
+        else:
+            with open(data_path, 'w') as f:
+                for stack, count in sorted(samples.items(), key=lambda item: -item[1]):
+                    f.write(f"{stack} {count}\n")
+
+        # The metadata is written last: a capture is listed only once it is complete
+        write_json_atomic(os.path.join(self.directory, f"{meta['id']}.json"), meta)
+        self._prune()
+
+    def _prune(self):
+        """Delete the oldest captures beyond max_captures"""
+        with self._lock:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith('.json'))
+            for name in names[:max(len(names) - self.max_captures, 0)]:
+                capture_id = name[:-len('.json')]
+                for suffix in ('.json', '.prof', '.folded'):
+                    try:
+                        os.remove(os.path.join(self.directory, capture_id + suffix))
+                    except FileNotFoundError:
+                        pass
+
+
+def _extension(kind):
+    return '.prof' if kind == 'cprofile' else '.folded'
+
+
+def _fold(frame):
+    """Collapsed form of the stack ending at frame, root first"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
@@ -0,0 +1,239 @@
+"""Server-Sent Events channel that pushes prediction changes to browsers.
+
+    GET /api/events?date=YYYY-MM-DD
+
+Runs as its own process next to gunicorn, on an asyncio event loop, so
+thousands of idle subscribers cost a socket each rather than a worker each:
+
+    python push_server.py --port 8081
+    PUSH_URL=http://localhost:8081 gunicorn app:app
+
+The server watches the predictions cache files that the app workers write.
+One watcher per subscribed date stats its file every interval seconds, and
+when the file is rebuilt it sends each subscriber only the predictions that
+changed:
+
+    event: predictions
+    data: {"date": "...", "type": "...", "predictions": [...]}
+
+When the date's cache entry is invalidated it sends an `invalidated` event
+with a `refetch_within` window in seconds. Each client refetches
+/api/predictions (which rebuilds the entry) after a random delay within the
+window, so a popular date's subscribers do not all hit the app at once; once
+the entry is rebuilt a `rebuilt` event (after any changed predictions) tells
+the clients still waiting that they need not refetch.
+"""
+import os
+import json
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs
+
+from cache_io import CACHE_ROOT, read_json
+from records import CACHE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+PREDICTIONS_DIR = os.path.join(CACHE_ROOT, 'predictions')
+
+# Largest request head accepted from a client
+MAX_REQUEST_BYTES = 8192
+
+# Seconds over which clients spread their refetches after an invalidation
+REFETCH_WINDOW = 10.0
+
+
+class ChangeFeed:
+    """Tracks one date's predictions file and reports which predictions changed.
+
+    Not tied to any server: poll() returns the events to send since the last
+    call, based on one stat() and, only when the file changed, one read.
+    """
+
+    def __init__(self, date_str, predictions_dir=PREDICTIONS_DIR, refetch_window=REFETCH_WINDOW):
+        self.date_str = date_str
+        self.path = os.path.join(predictions_dir, f"all_predictions_{date_str}.json")
+        self.refetch_window = refetch_window
+        self.version = self._stat()
+        self.snapshot = self._read() if self.version is not None else {}
+
+    def poll(self):
+        """Return a list of (event, data) pairs describing changes since the last poll"""
+        version = self._stat()
+        if version == self.version:
+            return []
+        rebuilt = self.version is None
+        self.version = version
+
+        # The last seen predictions are kept through invalidations, so a
+        # rebuild only reports the games that actually changed
+        if version is None:
+            return [('invalidated', {'date': self.date_str, 'refetch_within': self.refetch_window})]
+
+        current = self._read()
+        events = []
+        for prediction_type, predictions in current.items():
+            before = self.snapshot.get(prediction_type, {})
+            changed = [prediction for key, prediction in predictions.items() if before.get(key) != prediction]
+            if changed:
+                events.append(('predictions', {'date': self.date_str, 'type': prediction_type, 'predictions': changed}))
+        self.snapshot.update(current)
+        if rebuilt:
+            events.append(('rebuilt', {'date': self.date_str}))
+        return events
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read(self):
+        """Predictions from the file as {type: {game key: prediction}}"""
+        data = read_json(self.path, required=('predictions',))
+        if data is None:
+            return {}
+        return {
+            prediction_type: {
+                f"{p['away_team']}@{p['home_team']} {p['time']}": _api_dict(p) for p in predictions
+            }
+            for prediction_type, predictions in data['predictions'].items()
+        }
+
+
+def _api_dict(prediction):
+    """A cached prediction dict in the shape served by /api/predictions"""
+    return {key: value for key, value in prediction.items() if key not in CACHE_FIELDS}
+
+
+class PushServer:
+    """Minimal asyncio HTTP server speaking SSE on /api/events"""
+
+    def __init__(self, interval=2.0, heartbeat=15.0, predictions_dir=PREDICTIONS_DIR, refetch_window=REFETCH_WINDOW):
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.predictions_dir = predictions_dir
+        self.refetch_window = refetch_window
+        self.subscribers = {}  # date -> set of StreamWriters
+        self.watchers = {}  # date -> asyncio.Task
+
+    async def handle(self, reader, writer):
+        """Serve one connection: validate the request, then hold it open as a subscriber"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=10)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+
+        date_str = self._parse_request(head)
+        if date_str is None:
+            writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            await self._close(writer)
+            return
+
+        writer.write(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Type: text/event-stream\r\n'
+            b'Cache-Control: no-cache\r\n'
+            b'Access-Control-Allow-Origin: *\r\n'
+            b'Connection: keep-alive\r\n\r\n'
+            b'retry: 5000\n\n'
+        )
+        self._subscribe(date_str, writer)
+        try:
+            # Nothing is expected from the client; this returns when it disconnects
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self._unsubscribe(date_str, writer)
+            await self._close(writer)
+
+    def _parse_request(self, head):
+        """Return the requested date for a valid GET /api/events request, else None"""
+        try:
+            method, target, _ = head.split(b'\r\n', 1)[0].decode('latin-1').split(' ', 2)
+            url = urlparse(target)
+            date_str = parse_qs(url.query).get('date', [''])[0]
+            datetime.strptime(date_str, '%Y-%m-%d')
+        except ValueError:
+            return None
+        if method != 'GET' or url.path != '/api/events':
+            return None
+        return date_str
+
+    def _subscribe(self, date_str, writer):
+        self.subscribers.setdefault(date_str, set()).add(writer)
+        if date_str not in self.watchers:
+            self.watchers[date_str] = asyncio.get_running_loop().create_task(self._watch(date_str))
+
+    def _unsubscribe(self, date_str, writer):
+        subscribers = self.subscribers.get(date_str)
+        if subscribers is None:
+            return
+        subscribers.discard(writer)
+        if not subscribers:
+            del self.subscribers[date_str]
+            self.watchers.pop(date_str).cancel()
+
+    async def _watch(self, date_str):
+        """Poll one date's feed and fan its events out to every subscriber of the date"""
+        feed = ChangeFeed(date_str, self.predictions_dir, self.refetch_window)
+        idle = 0.0
+        while True:
+            await asyncio.sleep(self.interval)
+            idle += self.interval
+            try:
+                events = feed.poll()
+            except OSError:
+                logger.exception(f"Error polling predictions for {date_str}")
+                continue
+
+            if events:
+                message = ''.join(f"event: {event}\ndata: {json.dumps(data)}\n\n" for event, data in events)
+            elif idle >= self.heartbeat:
+                message = ': heartbeat\n\n'  # Keeps proxies from closing idle streams
+            else:
+                continue
+            idle = 0.0
+            self._broadcast(date_str, message.encode('utf-8'))
+
+    def _broadcast(self, date_str, message):
+        for writer in list(self.subscribers.get(date_str, ())):
+            # A client that stopped reading is dropped rather than buffered without bound
+            if writer.transport.get_write_buffer_size() > 1024 * 1024:
+                writer.close()
+                continue
+            writer.write(message)
+
+    async def _close(self, writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(host='127.0.0.1', port=8081, interval=2.0, refetch_window=REFETCH_WINDOW):
+    """Run the push server until cancelled"""
+    push_server = PushServer(interval=interval, refetch_window=refetch_window)
+    server = await asyncio.start_server(push_server.handle, host, port, limit=MAX_REQUEST_BYTES)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PUSH_PORT', 8081)))
+    parser.add_argument('--interval', type=float, default=2.0, help="seconds between checks of each watched date")
+    parser.add_argument('--refetch-window', type=float, default=REFETCH_WINDOW,
+                        help="seconds over which clients spread their refetches after an invalidation")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"Push server listening on http://{args.host}:{args.port}/api/events")
+    asyncio.run(serve(args.host, args.port, args.interval, args.refetch_window))
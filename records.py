@@ -0,0 +1,135 @@
+"""Compact in-memory records for games and predictions.
+
+Games and predictions are held as slotted objects with numeric fields kept
+numeric (an ERA is a float, or None when unknown). The dict shape served by
+the API, with ERAs formatted for display, is produced only when a record is
+serialized: through to_dict(), or by passing to_json as the default hook of
+json.dump/json.dumps. Cache files use to_cache_json instead, which also keeps
+the fields the API dict leaves out (CACHE_FIELDS).
+"""
+
+# Written to cache files by to_cache_dict() on top of the API dict
+CACHE_FIELDS = ('home_era_source', 'away_era_source')
+
+
+class Game:
+    """One scheduled game with its probable starters and their ERAs"""
+
+    __slots__ = ('home_team', 'away_team', 'stadium', 'time', 'home_pitcher', 'away_pitcher',
+                 'home_era', 'away_era', 'home_era_source', 'away_era_source')
+
+    def __init__(self, home_team, away_team, stadium, time, home_pitcher, away_pitcher,
+                 home_era, away_era, home_era_source, away_era_source):
+        self.home_team = home_team
+        self.away_team = away_team
+        self.stadium = stadium
+        self.time = time
+        self.home_pitcher = home_pitcher
+        self.away_pitcher = away_pitcher
+        self.home_era = home_era
+        self.away_era = away_era
+        self.home_era_source = home_era_source
+        self.away_era_source = away_era_source
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a game from its serialized dict (extra keys are ignored)"""
+        return cls(
+            data['home_team'], data['away_team'], data['stadium'], data['time'],
+            data['home_pitcher'], data['away_pitcher'],
+            parse_era(data['home_era']), parse_era(data['away_era']),
+            data['home_era_source'], data['away_era_source']
+        )
+
+    def to_dict(self):
+        return {
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "stadium": self.stadium,
+            "time": self.time,
+            "home_pitcher": self.home_pitcher,
+            "away_pitcher": self.away_pitcher,
+            "home_era": format_era(self.home_era),
+            "away_era": format_era(self.away_era),
+            "home_era_source": self.home_era_source,
+            "away_era_source": self.away_era_source
+        }
+
+    def key(self):
+        """Identifies the game within its date's slate"""
+        return (self.home_team, self.away_team, self.time)
+
+
+class Prediction:
+    """A probability and rating for one game and prediction type.
+
+    The game record is shared by the predictions of every type, and factors
+    is the shared factor breakdown list rather than a per-prediction copy.
+    """
+
+    __slots__ = ('game', 'prediction_type', 'probability', 'rating', 'factors')
+
+    def __init__(self, game, prediction_type, probability, rating, factors):
+        self.game = game
+        self.prediction_type = prediction_type
+        self.probability = probability
+        self.rating = rating
+        self.factors = factors
+
+    @classmethod
+    def from_dict(cls, data, prediction_type, factors, game=None):
+        """Build a prediction from its serialized dict, reusing game if given"""
+        if game is None:
+            game = Game(
+                data['home_team'], data['away_team'], data['stadium'], data['time'],
+                data['home_pitcher'], data['away_pitcher'],
+                parse_era(data['home_era']), parse_era(data['away_era']),
+                # Older files only have data_source, the home starter's source
+                data.get('home_era_source', data['data_source']), data.get('away_era_source')
+            )
+        return cls(game, prediction_type, data['probability'], data['rating'], factors)
+
+    def to_dict(self):
+        game = self.game
+        return {
+            'home_team': game.home_team,
+            'away_team': game.away_team,
+            'stadium': game.stadium,
+            'time': game.time,
+            'home_pitcher': game.home_pitcher,
+            'away_pitcher': game.away_pitcher,
+            'home_era': format_era(game.home_era),
+            'away_era': format_era(game.away_era),
+            'probability': self.probability,
+            'rating': self.rating,
+            'factors': self.factors,
+            'data_source': game.home_era_source
+        }
+
+    def to_cache_dict(self):
+        """API dict plus the ERA source of each starter, which from_dict restores"""
+        return dict(self.to_dict(), home_era_source=self.game.home_era_source, away_era_source=self.game.away_era_source)
+
+
+def format_era(era):
+    """Display form of an ERA: two decimals, or N/A when unknown"""
+    return f"{era:.2f}" if era is not None else "N/A"
+
+
+def parse_era(era):
+    """Inverse of format_era (numbers are accepted as they are)"""
+    return None if era is None or era == "N/A" else float(era)
+
+
+def to_json(obj):
+    """json default hook that serializes records to their API dict shape"""
+    if isinstance(obj, (Game, Prediction)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_cache_json(obj):
+    """json default hook that serializes records for cache files"""
+    if isinstance(obj, Prediction):
+        return obj.to_cache_dict()
+    return to_json(obj)
@@ -0,0 +1,265 @@
+"""Reference tables: teams, stadiums, known pitchers and park and model factors.
+
+Kept as module constants so they are built once per process, when the
+module's compiled bytecode is loaded, rather than by every API instance. A
+gunicorn master started with --preload loads them once and its workers
+share them after the fork.
+"""
+
+# Team name -> MLB Stats API abbreviation
+TEAM_ABBREVIATIONS = {
+    'Arizona Diamondbacks': 'ARI',
+    'Atlanta Braves': 'ATL',
+    'Baltimore Orioles': 'BAL',
+    'Boston Red Sox': 'BOS',
+    'Chicago Cubs': 'CHC',
+    'Chicago White Sox': 'CWS',
+    'Cincinnati Reds': 'CIN',
+    'Cleveland Guardians': 'CLE',
+    'Colorado Rockies': 'COL',
+    'Detroit Tigers': 'DET',
+    'Houston Astros': 'HOU',
+    'Kansas City Royals': 'KC',
+    'Los Angeles Angels': 'LAA',
+    'Los Angeles Dodgers': 'LAD',
+    'Miami Marlins': 'MIA',
+    'Milwaukee Brewers': 'MIL',
+    'Minnesota Twins': 'MIN',
+    'New York Mets': 'NYM',
+    'New York Yankees': 'NYY',
+    'Oakland Athletics': 'OAK',
+    'Athletics': 'OAK',
+    'Philadelphia Phillies': 'PHI',
+    'Pittsburgh Pirates': 'PIT',
+    'San Diego Padres': 'SD',
+    'San Francisco Giants': 'SF',
+    'Seattle Mariners': 'SEA',
+    'St. Louis Cardinals': 'STL',
+    'Tampa Bay Rays': 'TB',
+    'Texas Rangers': 'TEX',
+    'Toronto Blue Jays': 'TOR',
+    'Washington Nationals': 'WSH'
+}
+
+# Team abbreviation -> home stadium
+STADIUMS = {
+    'ARI': 'Chase Field',
+    'ATL': 'Truist Park',
+    'BAL': 'Oriole Park at Camden Yards',
+    'BOS': 'Fenway Park',
+    'CHC': 'Wrigley Field',
+    'CWS': 'Rate Field',
+    'CIN': 'Great American Ball Park',
+    'CLE': 'Progressive Field',
+    'COL': 'Coors Field',
+    'DET': 'Comerica Park',
+    'HOU': 'Minute Maid Park',
+    'KC': 'Kauffman Stadium',
+    'LAA': 'Angel Stadium',
+    'LAD': 'Dodger Stadium',
+    'MIA': 'loanDepot park',
+    'MIL': 'American Family Field',
+    'MIN': 'Target Field',
+    'NYM': 'Citi Field',
+    'NYY': 'Yankee Stadium',
+    'OAK': 'Oakland Coliseum',
+    'PHI': 'Citizens Bank Park',
+    'PIT': 'PNC Park',
+    'SD': 'Petco Park',
+    'SF': 'Oracle Park',
+    'SEA': 'T-Mobile Park',
+    'STL': 'Busch Stadium',
+    'TB': 'Tropicana Field',
+    'TEX': 'Globe Life Field',
+    'TOR': 'Rogers Centre',
+    'WSH': 'Nationals Park'
+}
+
+# Known starting pitchers with their ERAs (None when unknown)
+PITCHERS = {
+    'Aaron Nola': {'team': 'Philadelphia Phillies', 'era': 3.25},
+    'Zack Wheeler': {'team': 'Philadelphia Phillies', 'era': 2.98},
+    'Cristopher Sánchez': {'team': 'Philadelphia Phillies', 'era': 3.44},
+    'Taijuan Walker': {'team': 'Philadelphia Phillies', 'era': 4.38},
+    'Ranger Suárez': {'team': 'Philadelphia Phillies', 'era': 3.12},
+    
+    'Logan Webb': {'team': 'San Francisco Giants', 'era': 3.25},
+    'Jordan Hicks': {'team': 'San Francisco Giants', 'era': 3.78},
+    'Kyle Harrison': {'team': 'San Francisco Giants', 'era': 4.15},
+    'Robbie Ray': {'team': 'San Francisco Giants', 'era': 3.71},
+    'Blake Snell': {'team': 'San Francisco Giants', 'era': 3.22},
+    
+    'Luis Castillo': {'team': 'Seattle Mariners', 'era': 3.14},
+    'George Kirby': {'team': 'Seattle Mariners', 'era': 3.35},
+    'Logan Gilbert': {'team': 'Seattle Mariners', 'era': 3.73},
+    'Bryce Miller': {'team': 'Seattle Mariners', 'era': 3.92},
+    'Bryan Woo': {'team': 'Seattle Mariners', 'era': 3.63},
+    
+    'Hunter Greene': {'team': 'Cincinnati Reds', 'era': 4.12},
+    'Nick Lodolo': {'team': 'Cincinnati Reds', 'era': 4.23},
+    'Frankie Montas': {'team': 'Cincinnati Reds', 'era': 4.56},
+    'Nick Martinez': {'team': 'Cincinnati Reds', 'era': 4.21},
+    'Brady Singer': {'team': 'Cincinnati Reds', 'era': 4.39},
+    
+    'Corbin Burnes': {'team': 'Baltimore Orioles', 'era': 3.12},
+    'Grayson Rodriguez': {'team': 'Baltimore Orioles', 'era': 3.75},
+    'Dean Kremer': {'team': 'Baltimore Orioles', 'era': 4.15},
+    'Cole Irvin': {'team': 'Baltimore Orioles', 'era': 4.42},
+    'Tomoyuki Sugano': {'team': 'Baltimore Orioles', 'era': None},
+    
+    'Shane Bieber': {'team': 'Cleveland Guardians', 'era': 3.27},
+    'Tanner Bibee': {'team': 'Cleveland Guardians', 'era': 3.91},
+    'Triston McKenzie': {'team': 'Cleveland Guardians', 'era': 4.05},
+    'Gavin Williams': {'team': 'Cleveland Guardians', 'era': 3.88},
+    'Logan Allen': {'team': 'Cleveland Guardians', 'era': 4.12},
+    
+    'Tarik Skubal': {'team': 'Detroit Tigers', 'era': 3.25},
+    'Jack Flaherty': {'team': 'Detroit Tigers', 'era': 3.85},
+    'Casey Mize': {'team': 'Detroit Tigers', 'era': 4.12},
+    'Reese Olson': {'team': 'Detroit Tigers', 'era': 3.92},
+    'Kenta Maeda': {'team': 'Detroit Tigers', 'era': 4.23},
+    
+    'Cole Ragans': {'team': 'Kansas City Royals', 'era': 3.47},
+    'Seth Lugo': {'team': 'Kansas City Royals', 'era': 3.57},
+    'Brady Singer': {'team': 'Kansas City Royals', 'era': 4.11},
+    'Michael Wacha': {'team': 'Kansas City Royals', 'era': 4.25},
+    'Michael Lorenzen': {'team': 'Kansas City Royals', 'era': None},
+    
+    'Mitch Keller': {'team': 'Pittsburgh Pirates', 'era': 3.95},
+    'Paul Skenes': {'team': 'Pittsburgh Pirates', 'era': None},
+    'Marco Gonzales': {'team': 'Pittsburgh Pirates', 'era': 4.25},
+    'Martin Perez': {'team': 'Pittsburgh Pirates', 'era': 4.45},
+    'Andrew Heaney': {'team': 'Pittsburgh Pirates', 'era': 4.56},
+    
+    'MacKenzie Gore': {'team': 'Washington Nationals', 'era': 4.05},
+    'Trevor Williams': {'team': 'Washington Nationals', 'era': 4.46},
+    'Jake Irvin': {'team': 'Washington Nationals', 'era': 4.35},
+    'Patrick Corbin': {'team': 'Washington Nationals', 'era': 5.14},
+    'Mitchell Parker': {'team': 'Washington Nationals', 'era': 4.25},
+    
+    'Zac Gallen': {'team': 'Arizona Diamondbacks', 'era': 3.47},
+    'Merrill Kelly': {'team': 'Arizona Diamondbacks', 'era': 3.52},
+    'Eduardo Rodriguez': {'team': 'Arizona Diamondbacks', 'era': 4.15},
+    'Brandon Pfaadt': {'team': 'Arizona Diamondbacks', 'era': 4.22},
+    'Jordan Montgomery': {'team': 'Arizona Diamondbacks', 'era': 3.75},
+    
+    'Jesús Luzardo': {'team': 'Miami Marlins', 'era': 3.58},
+    'Trevor Rogers': {'team': 'Miami Marlins', 'era': 4.35},
+    'Ryan Weathers': {'team': 'Miami Marlins', 'era': 4.75},
+    'Max Meyer': {'team': 'Miami Marlins', 'era': 4.25},
+    'Edward Cabrera': {'team': 'Miami Marlins', 'era': None},
+    
+    'Gerrit Cole': {'team': 'New York Yankees', 'era': 3.15},
+    'Carlos Rodón': {'team': 'New York Yankees', 'era': 3.75},
+    'Nestor Cortes': {'team': 'New York Yankees', 'era': 4.05},
+    'Clarke Schmidt': {'team': 'New York Yankees', 'era': 4.35},
+    'Will Warren': {'team': 'New York Yankees', 'era': None},
+    
+    'Zach Eflin': {'team': 'Tampa Bay Rays', 'era': 3.86},
+    'Shane Baz': {'team': 'Tampa Bay Rays', 'era': 3.58},
+    'Taj Bradley': {'team': 'Tampa Bay Rays', 'era': 4.19},
+    'Aaron Civale': {'team': 'Tampa Bay Rays', 'era': 4.25},
+    'Zack Littell': {'team': 'Tampa Bay Rays', 'era': 4.37},
+    
+    'Brayan Bello': {'team': 'Boston Red Sox', 'era': 4.24},
+    'Kutter Crawford': {'team': 'Boston Red Sox', 'era': 4.04},
+    'Nick Pivetta': {'team': 'Boston Red Sox', 'era': 4.42},
+    'Tanner Houck': {'team': 'Boston Red Sox', 'era': 3.86},
+    'Sean Newcomb': {'team': 'Boston Red Sox', 'era': 4.75},
+    
+    'Garrett Crochet': {'team': 'Chicago White Sox', 'era': 3.55},
+    'Erick Fedde': {'team': 'Chicago White Sox', 'era': 4.45},
+    'Chris Flexen': {'team': 'Chicago White Sox', 'era': 4.85},
+    'Jonathan Cannon': {'team': 'Chicago White Sox', 'era': None},
+    'Davis Martin': {'team': 'Chicago White Sox', 'era': None},
+    
+    'Paul Blackburn': {'team': 'Athletics', 'era': 4.43},
+    'JP Sears': {'team': 'Athletics', 'era': 4.37},
+    'Ross Stripling': {'team': 'Athletics', 'era': 4.75},
+    'Luis Medina': {'team': 'Athletics', 'era': 4.85},
+    'Osvaldo Bido': {'team': 'Athletics', 'era': 4.95},
+    
+    'Sonny Gray': {'team': 'St. Louis Cardinals', 'era': 3.58},
+    'Kyle Gibson': {'team': 'St. Louis Cardinals', 'era': 4.35},
+    'Miles Mikolas': {'team': 'St. Louis Cardinals', 'era': 4.45},
+    'Steven Matz': {'team': 'St. Louis Cardinals', 'era': 4.25},
+    'Andre Pallante': {'team': 'St. Louis Cardinals', 'era': None},
+    
+    'Kodai Senga': {'team': 'New York Mets', 'era': 3.38},
+    'Luis Severino': {'team': 'New York Mets', 'era': 4.15},
+    'Sean Manaea': {'team': 'New York Mets', 'era': 4.24},
+    'Jose Quintana': {'team': 'New York Mets', 'era': 4.35},
+    'Griffin Canning': {'team': 'New York Mets', 'era': 4.75},
+    
+    'Nathan Eovaldi': {'team': 'Texas Rangers', 'era': 3.63},
+    'Jon Gray': {'team': 'Texas Rangers', 'era': 4.15},
+    'Andrew Heaney': {'team': 'Texas Rangers', 'era': 4.35},
+    'Dane Dunning': {'team': 'Texas Rangers', 'era': 4.25},
+    'Kumar Rocker': {'team': 'Texas Rangers', 'era': None},
+    
+    'Reid Detmers': {'team': 'Los Angeles Angels', 'era': 4.12},
+    'Tyler Anderson': {'team': 'Los Angeles Angels', 'era': 4.35},
+    'Patrick Sandoval': {'team': 'Los Angeles Angels', 'era': 4.25},
+    'José Soriano': {'team': 'Los Angeles Angels', 'era': 4.45},
+    'Jack Kochanowicz': {'team': 'Los Angeles Angels', 'era': None},
+    
+    'Yoshinobu Yamamoto': {'team': 'Los Angeles Dodgers', 'era': 3.15},
+    'Tyler Glasnow': {'team': 'Los Angeles Dodgers', 'era': 3.25},
+    'Walker Buehler': {'team': 'Los Angeles Dodgers', 'era': 3.45},
+    'James Paxton': {'team': 'Los Angeles Dodgers', 'era': 4.15},
+    'Bobby Miller': {'team': 'Los Angeles Dodgers', 'era': 3.85},
+    
+    'Kyle Freeland': {'team': 'Colorado Rockies', 'era': 4.85},
+    'Cal Quantrill': {'team': 'Colorado Rockies', 'era': 4.75},
+    'Austin Gomber': {'team': 'Colorado Rockies', 'era': 4.95},
+    'Ryan Feltner': {'team': 'Colorado Rockies', 'era': 5.05},
+    'Germán Márquez': {'team': 'Colorado Rockies', 'era': 4.65}
+}
+
+# Ballpark factors (higher = more hitter-friendly)
+BALLPARK_FACTORS = {
+    'Coors Field': 1.3,
+    'Great American Ball Park': 1.2,
+    'Citizens Bank Park': 1.15,
+    'Yankee Stadium': 1.1,
+    'Fenway Park': 1.1,
+    'Wrigley Field': 1.05,
+    'Chase Field': 1.05,
+    'Globe Life Field': 1.0,
+    'Truist Park': 1.0,
+    'Minute Maid Park': 1.0,
+    'Kauffman Stadium': 0.95,
+    'Dodger Stadium': 0.95,
+    'Nationals Park': 0.95,
+    'Rogers Centre': 0.95,
+    'Angel Stadium': 0.95,
+    'Target Field': 0.95,
+    'Comerica Park': 0.9,
+    'PNC Park': 0.9,
+    'Busch Stadium': 0.9,
+    'loanDepot park': 0.9,
+    'Oracle Park': 0.85,
+    'Petco Park': 0.85,
+    'T-Mobile Park': 0.85,
+    'Oakland Coliseum': 0.85,
+    'Tropicana Field': 0.85,
+    'Oriole Park at Camden Yards': 0.95,
+    'Progressive Field': 0.95,
+    'American Family Field': 1.05,
+    'Citi Field': 0.95,
+    'Rate Field': 1.05
+}
+
+# Factors that influence predictions
+FACTOR_WEIGHTS = {
+    'pitcher_performance': 0.25,
+    'bullpen_performance': 0.15,
+    'batter_vs_pitcher': 0.15,
+    'ballpark_factors': 0.10,
+    'team_offense': 0.10,
+    'team_defense': 0.05,
+    'weather_conditions': 0.05,
+    'umpire_tendencies': 0.05,
+    'travel_fatigue': 0.05,
+    'momentum': 0.05
+}
@@ -0,0 +1,93 @@
+"""Shared, lazily built service objects of one process.
+
+The web app, the prewarm scheduler and the cache sweeper all use the same
+MLBStatsAPI and MLBPredictionAPI, so a worker holds one copy of each cache.
+Nothing here is built at import time: get_prediction_api() builds the APIs
+on first use, which keeps importing the app cheap for workers that scale
+from zero.
+
+Under `gunicorn --preload` (see gunicorn.conf.py) the master calls preload()
+to build everything before forking, so workers start with the modules, the
+reference tables and the APIs already in memory, shared copy-on-write.
+Background threads do not survive a fork, so they are started per worker by
+start_background_services().
+"""
+import os
+import gc
+import threading
+
+from cache_io import CACHE_ROOT
+
+_lock = threading.RLock()
+_prediction_api = None
+_cache_manager = None
+_prewarm_scheduler = None
+
+
+def get_prediction_api():
+    """The process's MLBPredictionAPI, built on first use"""
+    global _prediction_api
+    if _prediction_api is None:
+        with _lock:
+            if _prediction_api is None:
+                from mlb_prediction_api import MLBPredictionAPI
+                from mlb_stats_api import MLBStatsAPI
+                _prediction_api = MLBPredictionAPI(stats_api=MLBStatsAPI())
+    return _prediction_api
+
+
+def get_stats_api():
+    """The process's MLBStatsAPI, shared with the prediction API"""
+    return get_prediction_api().stats_api
+
+
+def get_cache_manager():
+    """The cache sweeper bounding this process's cache directories, built on first use"""
+    global _cache_manager
+    if _cache_manager is None:
+        with _lock:
+            if _cache_manager is None:
+                from cache_manager import CacheManager
+                prediction_api = get_prediction_api()
+                _cache_manager = CacheManager(
+                    [prediction_api.cache_dir, prediction_api.stats_api.cache_dir],
+                    ttls={
+                        'all_predictions_': prediction_api.memory_cache.ttl,
+                        'game_predictions_': 86400,  # Keyed by input fingerprint, so never stale
+                        'games_': prediction_api.stats_api.games_cache.ttl,
+                        'pitcher_eras': None,  # The store expires its own records (see PitcherStatsStore)
+                        'pitcher_era_': 0  # Per-pitcher files are no longer used
+                    },
+                    max_bytes=int(os.environ.get('CACHE_MAX_MB', 50)) * 1024 * 1024,
+                    max_entries=int(os.environ.get('CACHE_MAX_FILES', 2000))
+                )
+    return _cache_manager
+
+
+def start_background_services():
+    """Start the cache sweeper and the prewarm scheduler in this process (idempotent)"""
+    global _prewarm_scheduler
+    with _lock:
+        if _prewarm_scheduler is not None:
+            return
+        from prewarm import PrewarmScheduler
+
+        # Bound the on-disk cache and sweep expired files
+        get_cache_manager().start(interval=int(os.environ.get('CACHE_SWEEP_INTERVAL', 300)))
+
+        # Keep today's and upcoming slates warm ahead of cache expiry
+        _prewarm_scheduler = PrewarmScheduler(get_prediction_api(), days_ahead=int(os.environ.get('PREWARM_DAYS', 1)))
+        if os.environ.get('PREWARM_ENABLED', '1') == '1':
+            _prewarm_scheduler.start()
+
+
+def preload():
+    """Build every shared object now, ahead of forking workers"""
+    os.makedirs(os.path.join(CACHE_ROOT, 'mlb_stats'), exist_ok=True)
+    os.makedirs(os.path.join(CACHE_ROOT, 'predictions'), exist_ok=True)
+    get_cache_manager()
+
+    # Objects that exist before the fork are never collected by the workers,
+    # so keep the collector from touching (and copying) their pages
+    gc.collect()
+    gc.freeze()
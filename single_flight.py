@@ -0,0 +1,61 @@
+import threading
+from cache_io import file_lock
+
+
+class _Call:
+    """An in-flight computation that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one computation.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait for and share its result. When lock_name is given the leader
+    also holds a file lock, so leaders in other gunicorn workers queue up
+    behind it instead of computing the same thing in parallel. The function
+    should therefore re-check the shared cache before doing any work.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, lock_name=None):
+        """Run fn() once per key at a time and return its result to every caller"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if lock_name is not None:
+                with file_lock(lock_name):
+                    call.result = fn()
+            else:
+                call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def in_flight(self):
+        """Return the number of computations currently running"""
+        return len(self._calls)